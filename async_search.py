@@ -0,0 +1,224 @@
+# Searching problems whose successors come from somewhere slow, like a graph store over a socket.
+#
+# bfs and astar call get_successors for one state at a time and sit idle while each call waits
+# on the store. The searches here are coroutines that keep up to `concurrency` calls in flight at
+# once, so the waits overlap, while still returning the paths the one-at-a-time searches would:
+#
+# - async_bfs fetches the successors of the next states in the FIFO frontier ahead of time and
+#   handles the replies in frontier order, so states are discovered in exactly the order bfs
+#   discovers them.
+# - async_astar expands the best few states of the frontier at once. A reply can show that a
+#   state already being expanded has a cheaper route, in which case it is expanded again, and a
+#   goal is only accepted once nothing still in flight or on the frontier could lead to a
+#   cheaper one.
+
+import asyncio
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from itertools import count
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Tuple, Union
+
+from search import null_heuristic, reconstruct_path
+from search_problem import SearchProblem, State
+
+
+class AsyncSearchProblem(ABC, Generic[State]):
+    """
+    A SearchProblem whose get_successors is a coroutine. The start state and goal test are
+    assumed to be cheap and stay synchronous.
+    """
+    @abstractmethod
+    def get_start_state(self) -> State:
+        """
+        Produces the state from which to search.
+        """
+        pass
+
+    @abstractmethod
+    def is_goal_state(self, state: State) -> bool:
+        """
+        Produces the boolean that the given state, state, is a goal state.
+        """
+        pass
+
+    @abstractmethod
+    async def get_successors(self, state: State) -> Union[List[State], Dict[State, float]]:
+        """
+        Produces the states that can be reached from the given state, as a list, or as a
+        dictionary of their edge costs (see weighted_successors).
+        """
+        pass
+
+
+class FakeGraphStore(AsyncSearchProblem[State]):
+    """
+    An in-process stand-in for a remote graph store: serves the successors of a synchronous
+    SearchProblem, each call taking latency seconds, for trying out the async searches.
+
+    Attributes:
+        problem (SearchProblem[State]): The problem being served.
+        latency (float): The seconds each get_successors call waits before replying.
+        fetches (int): The number of get_successors calls so far.
+        max_in_flight (int): The most calls that were waiting at the same time.
+    """
+    def __init__(self, problem: SearchProblem[State], latency: float = 0.001):
+        """
+        problem - the problem whose successors to serve
+
+        latency - the seconds each get_successors call takes
+        """
+        self.problem = problem
+        self.latency = latency
+        self.fetches = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+
+    def get_start_state(self) -> State:
+        return self.problem.get_start_state()
+
+    def is_goal_state(self, state: State) -> bool:
+        return self.problem.is_goal_state(state)
+
+    async def get_successors(self, state: State) -> Union[List[State], Dict[State, float]]:
+        self.fetches += 1
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self._in_flight -= 1
+        return self.problem.get_successors(state)
+
+
+def _weighted(successors: Union[List[State], Dict[State, float]]) -> Iterable[Tuple[State, float]]:
+    """The (successor, cost) pairs of a get_successors reply, as weighted_successors makes them."""
+    if isinstance(successors, dict):
+        return successors.items()
+    return ((successor, 1) for successor in successors)
+
+
+async def async_bfs(problem: AsyncSearchProblem[State], concurrency: int = 16) -> Tuple[Optional[List[State]], Dict[str, int]]:
+    """
+    Performs Breadth-First Search with up to concurrency get_successors calls in flight.
+
+    The successors of the next states in the frontier are fetched ahead of time, but the
+    replies are handled in frontier order, so the search discovers states in the same order
+    as bfs and returns the same path.
+
+    Args:
+        problem (AsyncSearchProblem[State]): The search problem to solve.
+        concurrency (int): The most get_successors calls to have waiting at once; 1 fetches
+            one state at a time, like bfs.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]:
+            - A list of states representing the solution path, or None if no solution was found.
+            - A dictionary of search statistics with the same keys as bfs.
+    """
+    stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0}
+    start = problem.get_start_state()
+    frontier = deque([start])
+    parents = {start: None}
+    #(state, task) pairs for the states at the head of the frontier, in frontier order
+    in_flight = deque()
+    try:
+        while frontier or in_flight:
+            while frontier and len(in_flight) < concurrency:
+                cur_state = frontier.popleft()
+                if problem.is_goal_state(cur_state):
+                    #every state ahead of it in the frontier was queued before it, so this is the
+                    # goal bfs would reach first; whatever they still discover comes after it
+                    path = reconstruct_path(parents, cur_state, problem)
+                    stats["path_length"] = len(path)
+                    return path, stats
+                in_flight.append((cur_state, asyncio.ensure_future(problem.get_successors(cur_state))))
+            cur_state, task = in_flight.popleft()
+            for successor, _ in _weighted(await task):
+                if successor not in parents:
+                    parents[successor] = cur_state
+                    frontier.append(successor)
+            stats["states_expanded"] += 1
+            stats["max_frontier_size"] = max(stats["max_frontier_size"], len(frontier) + len(in_flight))
+    finally:
+        for _, task in in_flight:
+            task.cancel()
+    return None, stats
+
+
+async def async_astar(problem: AsyncSearchProblem[State], heuristic: Callable[[State, AsyncSearchProblem[State]], float] = None,
+                      concurrency: int = 16) -> Tuple[Optional[List[State]], Dict[str, float]]:
+    """
+    Performs A* search, expanding up to concurrency of the best states of the frontier at once.
+
+    A state expanded alongside others may turn out to have a cheaper route through one of
+    them, in which case it is expanded again with the new cost, and a goal is only accepted
+    once every state on the frontier or being expanded has an f value of at least its cost.
+    With an admissible heuristic the path is therefore as cheap as the one astar finds, though
+    more states may be expanded.
+
+    Args:
+        problem (AsyncSearchProblem[State]): The search problem to solve.
+        heuristic (Callable[[State, AsyncSearchProblem[State]], float]): An admissible estimate
+            of the remaining cost from a state to the goal. Defaults to null_heuristic, which
+            makes this uniform-cost search.
+        concurrency (int): The most get_successors calls to have waiting at once.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, float]]:
+            - A list of states representing the cheapest solution path, or None if no solution was found.
+            - A dictionary of search statistics with the same keys as astar.
+    """
+    if heuristic is None:
+        heuristic = null_heuristic
+    stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0, "path_cost": 0}
+    start = problem.get_start_state()
+    counter = count()
+    start_h = heuristic(start, problem)
+    frontier = [(start_h, start_h, next(counter), start)]
+    parents = {start: None}
+    costs = {start: 0}
+    expanded = set()
+    #maps each task to the state it expands, the cost it was expanded at and its f value
+    in_flight = {}
+    best_goal = None
+    try:
+        while True:
+            while frontier and len(in_flight) < concurrency:
+                f, _, _, cur_state = frontier[0]
+                if best_goal is not None and f >= costs[best_goal]:
+                    break #nothing left on the frontier can beat the goal found
+                heapq.heappop(frontier)
+                if cur_state in expanded:
+                    continue #stale entry left behind by a cheaper route
+                expanded.add(cur_state)
+                if problem.is_goal_state(cur_state):
+                    if best_goal is None or costs[cur_state] < costs[best_goal]:
+                        best_goal = cur_state
+                    continue
+                task = asyncio.ensure_future(problem.get_successors(cur_state))
+                in_flight[task] = (cur_state, costs[cur_state], f)
+            if best_goal is not None and all(f >= costs[best_goal] for _, _, f in in_flight.values()):
+                #deferred acceptance: no expansion still running can lead to a cheaper goal
+                path = reconstruct_path(parents, best_goal, problem)
+                stats["path_length"] = len(path)
+                stats["path_cost"] = costs[best_goal]
+                return path, stats
+            if not in_flight:
+                return None, stats
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                cur_state, cur_cost, _ = in_flight.pop(task)
+                stats["states_expanded"] += 1
+                for successor, step_cost in _weighted(task.result()):
+                    new_cost = cur_cost + step_cost
+                    if successor not in costs or new_cost < costs[successor]:
+                        costs[successor] = new_cost
+                        parents[successor] = cur_state
+                        expanded.discard(successor)
+                        successor_h = heuristic(successor, problem)
+                        heapq.heappush(frontier, (new_cost + successor_h, successor_h, next(counter), successor))
+            stats["max_frontier_size"] = max(stats["max_frontier_size"], len(frontier) + len(in_flight))
+    finally:
+        for task in in_flight:
+            task.cancel()
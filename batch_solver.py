@@ -0,0 +1,123 @@
+# Solving many independent mazes in parallel.
+#
+# A batch is a list of MazeSpec objects, each describing a maze by its generation parameters
+# (size, seed, generation algorithm) or by a maze file written with Maze.save. Specs are small,
+# so only they travel to the worker processes: every worker builds or opens its own mazes and
+# sends back just the path length and the search statistics, never a board.
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from maze import Maze
+from maze_file import MappedMaze
+from search import bfs
+
+
+class MazeSpec:
+    """
+    Describes one maze of a batch: either a maze to generate or a maze file to open.
+
+    Attributes:
+        id (Hashable): Identifies the maze in the results.
+        width (Optional[int]): The width of a maze to generate.
+        height (Optional[int]): The height of a maze to generate.
+        seed (Optional[int]): The generation seed; without one the maze is different every time.
+        start (Optional[Tuple[int, int]]): The start location; by default (0, 0), or the one
+            stored in the file.
+        goal (Optional[Tuple[int, int]]): The goal location; by default the south-east corner,
+            or the one stored in the file.
+        algorithm (str): The generation algorithm, one of GENERATION_ALGORITHMS.
+        path (Optional[str]): A maze file to open instead of generating a maze.
+    """
+    def __init__(self, id: Hashable, width: Optional[int] = None, height: Optional[int] = None,
+                 seed: Optional[int] = None, start: Optional[Tuple[int, int]] = None,
+                 goal: Optional[Tuple[int, int]] = None, algorithm: str = "drunken_walk",
+                 path: Optional[str] = None):
+        if path is None and (width is None or height is None):
+            raise ValueError("A MazeSpec needs either a width and height or a path")
+        self.id = id
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.start = start
+        self.goal = goal
+        self.algorithm = algorithm
+        self.path = path
+
+    def __repr__(self) -> str:
+        if self.path is not None:
+            return f"MazeSpec({self.id!r}, path={self.path!r})"
+        return f"MazeSpec({self.id!r}, {self.width}x{self.height}, seed={self.seed}, algorithm={self.algorithm!r})"
+
+
+def solve_spec(spec: MazeSpec, search: Callable = bfs) -> Tuple[Hashable, Optional[int], Dict[str, float]]:
+    """
+    Builds or opens the maze a spec describes and solves it.
+
+    Args:
+        spec (MazeSpec): The maze to solve.
+        search (Callable): The search function to solve it with.
+
+    Returns:
+        Tuple[Hashable, Optional[int], Dict[str, float]]: The spec's id, the length of the path
+        found (None if there is none) and the search statistics.
+    """
+    if spec.path is not None:
+        with MappedMaze(spec.path, spec.start, spec.goal) as maze:
+            path, stats = search(maze)
+    else:
+        maze = Maze(spec.width, spec.height, spec.start, spec.goal, algorithm=spec.algorithm, seed=spec.seed)
+        path, stats = search(maze)
+    return spec.id, len(path) if path is not None else None, stats
+
+
+def _solve_chunk(specs: List[MazeSpec], search: Callable) -> List[Tuple[Hashable, Optional[int], Dict[str, float]]]:
+    """Solves a chunk of specs inside a worker process."""
+    return [solve_spec(spec, search) for spec in specs]
+
+
+def solve_batch(specs: Iterable[MazeSpec], search: Callable = bfs, max_workers: Optional[int] = None,
+                chunksize: int = 8) -> Iterator[Tuple[Hashable, Optional[int], Dict[str, float]]]:
+    """
+    Solves a batch of mazes over a pool of worker processes, yielding each result as soon as the
+    chunk it belongs to is finished. Results therefore arrive out of order; use their ids to
+    match them up with the specs.
+
+    Specs are sent to the workers chunksize at a time, which keeps the cost of talking to the
+    workers small next to the work itself, and at most two chunks per worker are in flight, so
+    specs can be a lazy iterable of any length.
+
+    Args:
+        specs (Iterable[MazeSpec]): The mazes to solve.
+        search (Callable): The search function to solve them with. It must be a module-level
+            function, like bfs, so that it can be sent to the workers.
+        max_workers (Optional[int]): The number of worker processes; by default one per core.
+            With 1 the mazes are solved in this process, without a pool.
+        chunksize (int): The number of specs per chunk.
+
+    Yields:
+        Tuple[Hashable, Optional[int], Dict[str, float]]: The id, path length and search
+        statistics of each maze, as from solve_spec.
+    """
+    specs = iter(specs)
+    if max_workers == 1:
+        for spec in specs:
+            yield solve_spec(spec, search)
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        max_in_flight = 2 * max_workers
+        pending = set()
+        while True:
+            while len(pending) < max_in_flight:
+                chunk = list(islice(specs, chunksize))
+                if not chunk:
+                    break
+                pending.add(executor.submit(_solve_chunk, chunk, search))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
@@ -0,0 +1,292 @@
+# Benchmarks for maze generation and for the search functions.
+#
+# Every benchmark runs on seeded problems, so two runs measure exactly the same work and can be
+# compared. Results are lists of records (dictionaries) that can be written to JSON or CSV and
+# compared against a stored baseline:
+#
+#   python benchmark.py --sizes 10 100 500 --output results.json
+#   python benchmark.py --sizes 10 100 500 --baseline results.json
+#
+# The second command exits with status 1 if any benchmark got slower, used more memory or
+# found a different path length than in the baseline.
+
+import argparse
+import csv
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from directed_graph import DirectedGraph
+from maze import Maze, GENERATION_ALGORITHMS
+from maze_array import ArrayMaze
+from search import bfs, dfs, ucs, astar, manhattan_heuristic, bidirectional_bfs, batch_bfs
+from search_problem import SearchProblem
+
+MAZE_SIZES = (10, 50, 200, 1000, 2000)
+GRAPH_NODES = 300
+GRAPH_DENSITIES = (0.01, 0.05, 0.2)
+FIELDS = ("benchmark", "problem", "algorithm", "seconds", "states_per_second", "peak_memory_bytes",
+          "path_length", "states_expanded")
+
+
+def astar_manhattan(problem: SearchProblem) -> Tuple:
+    """A* with the Manhattan heuristic on mazes, and uniform-cost search on anything else."""
+    return astar(problem, manhattan_heuristic if isinstance(problem, Maze) else None)
+
+
+SEARCH_ALGORITHMS = {
+    "bfs": bfs,
+    "dfs": dfs,
+    "ucs": ucs,
+    "astar": astar_manhattan,
+    "bidirectional_bfs": bidirectional_bfs,
+    "batch_bfs": batch_bfs,
+}
+
+
+def random_graph(nodes: int, density: float, seed: int = 0) -> DirectedGraph:
+    """
+    Builds a seeded random DirectedGraph.
+
+    Args:
+        nodes (int): The number of nodes.
+        density (float): The probability of each edge being present.
+        seed (int): The random seed.
+
+    Returns:
+        DirectedGraph: A graph with edge weights between 1 and 10, starting at node 0 with the
+        last node as its only goal.
+    """
+    rng = random.Random(seed)
+    matrix = [[rng.randint(1, 10) if source != target and rng.random() < density else None
+               for target in range(nodes)] for source in range(nodes)]
+    return DirectedGraph(matrix, {nodes - 1})
+
+
+def measure(func: Callable, repeat: int = 1, setup: Optional[Callable] = None) -> Tuple[object, float, int]:
+    """
+    Times a call and measures its peak memory.
+
+    The call is first run once under tracemalloc, which slows it down too much to be timed, to
+    find the peak memory it allocates. Then it is timed repeat times without tracing and the
+    fastest time is kept.
+
+    Args:
+        func (Callable): The call to measure.
+        repeat (int): The number of timed runs.
+        setup (Optional[Callable]): If given, called before every run, untimed and untraced, and
+            its result passed to func. This gives each run fresh inputs, e.g. a problem whose
+            caches have not been filled by an earlier run.
+
+    Returns:
+        Tuple[object, float, int]: The result of the last call, the fastest time in seconds and
+        the peak memory in bytes.
+    """
+    args = () if setup is None else (setup(),)
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    if not tracing:
+        tracemalloc.stop()
+    seconds = None
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        # free the previous run's garbage now rather than while the next run is timed
+        result = None
+        gc.collect()
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    return result, seconds, peak
+
+
+def benchmark_search(make_problem: Callable[[], SearchProblem], problem_name: str, algorithms: Iterable[str],
+                     repeat: int = 1) -> List[Dict]:
+    """
+    Runs every named search algorithm on a problem.
+
+    Problems like Maze cache states and successors as they are searched, so every run gets a
+    fresh problem from make_problem: otherwise each algorithm would be timed on the caches the
+    ones before it filled, and its time would depend on which algorithms ran first.
+
+    Args:
+        make_problem (Callable[[], SearchProblem]): Builds the problem to solve; called before
+            every run, untimed.
+        problem_name (str): The name recorded for the problem.
+        algorithms (Iterable[str]): Names from SEARCH_ALGORITHMS.
+        repeat (int): The number of timed runs of each algorithm.
+
+    Returns:
+        List[Dict]: One record per algorithm, with the keys in FIELDS.
+    """
+    records = []
+    for name in algorithms:
+        search = SEARCH_ALGORITHMS[name]
+        (path, stats), seconds, peak = measure(search, repeat, setup=make_problem)
+        records.append({
+            "benchmark": "search",
+            "problem": problem_name,
+            "algorithm": name,
+            "seconds": seconds,
+            "states_per_second": stats["states_expanded"] / seconds if seconds > 0 else 0.0,
+            "peak_memory_bytes": peak,
+            "path_length": len(path) if path is not None else None,
+            "states_expanded": stats["states_expanded"],
+        })
+    return records
+
+
+def run_benchmarks(sizes: Sequence[int] = MAZE_SIZES, algorithms: Sequence[str] = tuple(SEARCH_ALGORITHMS),
+                   generators: Sequence[str] = GENERATION_ALGORITHMS, graph_nodes: int = GRAPH_NODES,
+                   densities: Sequence[float] = GRAPH_DENSITIES, seed: int = 0, repeat: int = 1,
+                   log: Optional[Callable[[str], None]] = None) -> List[Dict]:
+    """
+    Runs the whole benchmark suite: generating a size x size maze with each generation algorithm,
+    solving each maze with each search algorithm, and solving a random graph of each density.
+
+    Args:
+        sizes (Sequence[int]): The maze sizes.
+        algorithms (Sequence[str]): Names from SEARCH_ALGORITHMS.
+        generators (Sequence[str]): Names from GENERATION_ALGORITHMS.
+        graph_nodes (int): The number of nodes in each random graph.
+        densities (Sequence[float]): The edge densities of the random graphs.
+        seed (int): The seed for every maze and graph.
+        repeat (int): The number of timed runs of each benchmark.
+        log (Optional[Callable[[str], None]]): Called with a line of progress after each problem.
+
+    Returns:
+        List[Dict]: The benchmark records, with the keys in FIELDS.
+    """
+    records = []
+    for size in sizes:
+        for generator in generators:
+            problem_name = f"maze {size}x{size} {generator} seed {seed}"
+            maze, seconds, peak = measure(lambda: Maze(size, size, algorithm=generator, seed=seed), repeat)
+            records.append({
+                "benchmark": "generate",
+                "problem": problem_name,
+                "algorithm": generator,
+                "seconds": seconds,
+                "states_per_second": size * size / seconds if seconds > 0 else 0.0,
+                "peak_memory_bytes": peak,
+                "path_length": None,
+                "states_expanded": size * size,
+            })
+            # each search gets its own copy of the maze, rebuilt from the wall masks, which is
+            # much faster than generating it again
+            walls = ArrayMaze.from_maze(maze)
+            records.extend(benchmark_search(walls.to_maze, problem_name, algorithms, repeat))
+            if log:
+                log(f"{problem_name}: generated in {seconds:.3f}s")
+    for density in densities:
+        problem_name = f"graph {graph_nodes} density {density} seed {seed}"
+        records.extend(benchmark_search(lambda: random_graph(graph_nodes, density, seed), problem_name, algorithms, repeat))
+        if log:
+            log(f"{problem_name}: done")
+    return records
+
+
+def write_results(records: List[Dict], path: str):
+    """Writes benchmark records to a CSV file if path ends in .csv, and to JSON otherwise."""
+    with open(path, "w", newline="") as file:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            json.dump(records, file, indent=2)
+
+
+def read_results(path: str) -> List[Dict]:
+    """Reads benchmark records written by write_results."""
+    with open(path, "r", newline="") as file:
+        if not path.endswith(".csv"):
+            return json.load(file)
+        records = []
+        for row in csv.DictReader(file):
+            for field in ("seconds", "states_per_second"):
+                row[field] = float(row[field])
+            for field in ("peak_memory_bytes", "path_length", "states_expanded"):
+                row[field] = int(row[field]) if row[field] else None
+            records.append(row)
+        return records
+
+
+def compare(records: List[Dict], baseline: List[Dict], tolerance: float = 0.25) -> List[str]:
+    """
+    Compares benchmark records against a baseline run of the same benchmarks.
+
+    Args:
+        records (List[Dict]): The new records.
+        baseline (List[Dict]): The baseline records. Benchmarks missing from either are ignored.
+        tolerance (float): How much slower (or bigger) than the baseline a benchmark may be
+            before it counts as a regression, as a fraction of the baseline.
+
+    Returns:
+        List[str]: A description of every regression: a benchmark that took more than
+        (1 + tolerance) times as long or as much memory, or found a path of a different length.
+    """
+    baseline_by_key = {(record["benchmark"], record["problem"], record["algorithm"]): record for record in baseline}
+    regressions = []
+    for record in records:
+        key = (record["benchmark"], record["problem"], record["algorithm"])
+        old = baseline_by_key.get(key)
+        if old is None:
+            continue
+        name = f"{record['algorithm']} on {record['problem']}"
+        if record["path_length"] != old["path_length"]:
+            regressions.append(f"{name}: path length {record['path_length']} (baseline {old['path_length']})")
+        if record["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(f"{name}: {record['seconds']:.4f}s (baseline {old['seconds']:.4f}s)")
+        if record["peak_memory_bytes"] > old["peak_memory_bytes"] * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {record['peak_memory_bytes']} bytes "
+                               f"(baseline {old['peak_memory_bytes']} bytes)")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark maze generation and search')
+    parser.add_argument('--sizes', type=int, nargs='+', default=MAZE_SIZES, help='Maze sizes (default: %(default)s)')
+    parser.add_argument('--algorithms', nargs='+', default=list(SEARCH_ALGORITHMS), choices=list(SEARCH_ALGORITHMS),
+                        help='Search algorithms to run (default: all)')
+    parser.add_argument('--generators', nargs='+', default=list(GENERATION_ALGORITHMS), choices=list(GENERATION_ALGORITHMS),
+                        help='Maze generation algorithms to run (default: all)')
+    parser.add_argument('--graph-nodes', type=int, default=GRAPH_NODES, help='Nodes per random graph (default: %(default)s)')
+    parser.add_argument('--densities', type=float, nargs='*', default=GRAPH_DENSITIES,
+                        help='Edge densities of the random graphs (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for every maze and graph (default: 0)')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed runs per benchmark; the fastest is kept (default: 1)')
+    parser.add_argument('--output', help='Write the results to this .json or .csv file')
+    parser.add_argument('--baseline', help='Compare the results against this .json or .csv file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown before flagging a regression, as a fraction (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    records = run_benchmarks(args.sizes, args.algorithms, args.generators, args.graph_nodes, args.densities,
+                             args.seed, args.repeat, log=lambda line: print(line, file=sys.stderr))
+    for record in records:
+        print(f"{record['benchmark']:8} {record['algorithm']:17} {record['problem']:40} "
+              f"{record['seconds']:9.4f}s {record['states_per_second']:12.0f}/s "
+              f"{record['peak_memory_bytes'] / 2**20:9.2f} MiB  path {record['path_length']}")
+    if args.output:
+        write_results(records, args.output)
+    if args.baseline:
+        regressions = compare(records, read_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
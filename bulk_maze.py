@@ -0,0 +1,188 @@
+# Generating many mazes at once, for datasets.
+#
+# Maze.generate_board carves one maze a room at a time in Python. The algorithms here decide
+# every wall of a whole batch of mazes with array operations instead, on a stack of wall masks
+# of shape (count, height, width) (see NORTH, SOUTH, EAST and WEST in maze.py):
+#
+# - 'binary_tree': every room opens its north or its east wall, at random. The top row can only
+#   open east and the east column can only open north, so the top row and east column are long
+#   straight corridors.
+# - 'sidewinder': each row after the first is cut into runs of rooms joined east-west, at random,
+#   and one room of every run, chosen at random, opens north. The top row is one long corridor.
+#
+# Both make perfect mazes (there is exactly one path between any two rooms), decided one row
+# at a time with no state carried between rooms, which is what lets them be vectorized. Each
+# maze draws its random numbers from its own seed, so a maze is the same whichever batch or
+# chunk it is generated in.
+
+import argparse
+import sys
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from maze import Maze, MazeRoom, ALL_WALLS, NORTH, SOUTH, EAST, WEST
+
+BULK_ALGORITHMS = ('binary_tree', 'sidewinder')
+
+
+def _random_fields(seeds: Sequence[int], height: int, width: int) -> np.ndarray:
+    """Draws a (2, count, height, width) array of uniform random numbers, each maze from its own seed."""
+    fields = np.empty((2, len(seeds), height, width))
+    for i, seed in enumerate(seeds):
+        fields[:, i] = np.random.default_rng(seed).random((2, height, width))
+    return fields
+
+
+def _carve(walls: np.ndarray, open_north: np.ndarray, open_east: np.ndarray):
+    """Opens the north or east walls of the chosen rooms, and the matching wall of the room beyond."""
+    walls[open_north] &= ~np.uint8(NORTH)
+    walls[:, :-1][open_north[:, 1:]] &= ~np.uint8(SOUTH)
+    walls[open_east] &= ~np.uint8(EAST)
+    walls[:, :, 1:][open_east[:, :, :-1]] &= ~np.uint8(WEST)
+
+
+def binary_tree(seeds: Sequence[int], width: int, height: int) -> np.ndarray:
+    """
+    Generates a batch of mazes with the binary tree algorithm.
+
+    Args:
+        seeds (Sequence[int]): One seed per maze.
+        width (int): The width of every maze.
+        height (int): The height of every maze.
+
+    Returns:
+        np.ndarray: A (len(seeds), height, width) uint8 array of wall masks.
+    """
+    coins = _random_fields(seeds, height, width)[0] < 0.5
+    rows = np.arange(height)[:, None]
+    cols = np.arange(width)[None, :]
+    # on the top row only east is possible, and on the east column only north
+    open_north = np.where(rows == 0, False, np.where(cols == width - 1, True, coins))
+    open_east = np.where(cols == width - 1, False, (rows == 0) | ~coins)
+    walls = np.full((len(seeds), height, width), ALL_WALLS, dtype=np.uint8)
+    _carve(walls, open_north, open_east)
+    return walls
+
+
+def sidewinder(seeds: Sequence[int], width: int, height: int) -> np.ndarray:
+    """
+    Generates a batch of mazes with the sidewinder algorithm.
+
+    Args:
+        seeds (Sequence[int]): One seed per maze.
+        width (int): The width of every maze.
+        height (int): The height of every maze.
+
+    Returns:
+        np.ndarray: A (len(seeds), height, width) uint8 array of wall masks.
+    """
+    coins, keys = _random_fields(seeds, height, width)
+    count = len(seeds)
+    # a run ends at a room whose coin says so, and always at the east column; the top row is a
+    # single run that never opens north
+    ends_run = (coins < 0.5) | (np.arange(width) == width - 1)
+    ends_run[:, 0, :-1] = False
+    open_east = ~ends_run
+    # number the runs of every row of every maze: a run starts after each room that ends one
+    starts_run = np.ones_like(ends_run)
+    starts_run[:, :, 1:] = ends_run[:, :, :-1]
+    run_ids = np.cumsum(starts_run.ravel()).reshape(ends_run.shape) - 1
+    # the room with the largest key in each run is a uniformly random choice among its rooms
+    best_keys = np.full(run_ids.max() + 1, -1.0)
+    np.maximum.at(best_keys, run_ids.ravel(), keys.ravel())
+    open_north = keys == best_keys[run_ids]
+    open_north[:, 0] = False
+    walls = np.full((count, height, width), ALL_WALLS, dtype=np.uint8)
+    _carve(walls, open_north, open_east)
+    return walls
+
+
+def generate_mazes(seeds: Sequence[int], width: int, height: int, algorithm: str = "binary_tree") -> np.ndarray:
+    """
+    Generates a batch of mazes as stacked wall masks, with one of BULK_ALGORITHMS.
+
+    Args:
+        seeds (Sequence[int]): One seed per maze; the same seed always gives the same maze.
+        width (int): The width of every maze.
+        height (int): The height of every maze.
+        algorithm (str): 'binary_tree' or 'sidewinder'.
+
+    Returns:
+        np.ndarray: A (len(seeds), height, width) uint8 array of wall masks, one maze per slice,
+        e.g. for ArrayMaze.
+    """
+    if algorithm == "binary_tree":
+        return binary_tree(seeds, width, height)
+    if algorithm == "sidewinder":
+        return sidewinder(seeds, width, height)
+    raise ValueError(f"Unknown bulk generation algorithm {algorithm!r}, expected one of {BULK_ALGORITHMS}")
+
+
+def write_dataset(path: str, seeds: Sequence[int], width: int, height: int, algorithm: str = "binary_tree",
+                  chunk_size: int = 1024) -> int:
+    """
+    Generates mazes into a single NumPy .npy file of shape (len(seeds), height, width), a chunk
+    of mazes at a time, so only one chunk is ever in memory.
+
+    Args:
+        path (str): The .npy file to write.
+        seeds (Sequence[int]): One seed per maze, in the order to store the mazes.
+        width (int): The width of every maze.
+        height (int): The height of every maze.
+        algorithm (str): One of BULK_ALGORITHMS.
+        chunk_size (int): The number of mazes to generate per batch.
+
+    Returns:
+        int: The number of mazes written.
+    """
+    dataset = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(len(seeds), height, width))
+    for first in range(0, len(seeds), chunk_size):
+        chunk = seeds[first:first + chunk_size]
+        dataset[first:first + len(chunk)] = generate_mazes(chunk, width, height, algorithm)
+    dataset.flush()
+    del dataset
+    return len(seeds)
+
+
+def load_mazes(path: str, start: Optional[Tuple[int, int]] = None, goal: Optional[Tuple[int, int]] = None) -> Iterator[Maze]:
+    """
+    Reads the mazes of a dataset written by write_dataset, one at a time. The file is
+    memory-mapped, so each maze is read from disk only when it is reached.
+
+    Args:
+        path (str): The .npy file to read.
+        start (Optional[Tuple[int, int]]): The start location of every maze; (0, 0) by default.
+        goal (Optional[Tuple[int, int]]): The goal location of every maze; the south-east corner
+            by default.
+
+    Yields:
+        Maze: Each maze of the dataset, in order.
+    """
+    dataset = np.load(path, mmap_mode="r")
+    count, height, width = dataset.shape
+    for i in range(count):
+        board = [[MazeRoom.from_mask(mask) for mask in row] for row in dataset[i].tolist()]
+        yield Maze(width, height, start, goal, self_generating=False, board=board)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Generate a dataset of mazes into a .npy file')
+    parser.add_argument('output', help='The .npy file to write')
+    parser.add_argument('--count', type=int, default=1000, help='Number of mazes (default: %(default)s)')
+    parser.add_argument('--width', type=int, default=20, help='Width of every maze (default: %(default)s)')
+    parser.add_argument('--height', type=int, default=20, help='Height of every maze (default: %(default)s)')
+    parser.add_argument('--algorithm', default='binary_tree', choices=BULK_ALGORITHMS,
+                        help='Generation algorithm (default: %(default)s)')
+    parser.add_argument('--first-seed', type=int, default=0,
+                        help='Seed of the first maze; each next maze uses the next seed (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=1024, help='Mazes generated per batch (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    seeds = range(args.first_seed, args.first_seed + args.count)
+    write_dataset(args.output, seeds, args.width, args.height, args.algorithm, args.chunk_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,20 @@
-# A matrix representation of a directed graph.
+# A matrix representation of a directed graph, and a sparse (CSR) one for large graphs.
 # This is for your testing.
 # Read the assignment handout for details.
 
-from typing import List, Optional, Set
+from array import array
+from itertools import accumulate
+from operator import itemgetter
+from struct import Struct
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 
 from search_problem import SearchProblem
 
+# a node index, as written by encode_state
+NODE = Struct(">Q")
+
 
 class DirectedGraph(SearchProblem[int]):
     """
@@ -33,6 +42,8 @@ class DirectedGraph(SearchProblem[int]):
         self.matrix = matrix
         self.goal_indices = goal_indices
         self.start_state = start_state
+        self._transposed = None  # built on the first predecessor lookup
+        self._csr = None  # (offsets, targets) arrays, built on the first batched lookup
 
     def get_start_state(self):
         return self.start_state
@@ -49,3 +60,243 @@ class DirectedGraph(SearchProblem[int]):
                 successors[index] = cost
             index += 1
         return successors
+
+    def get_goal_states(self):
+        return self.goal_indices
+
+    def transposed_matrix(self):
+        """
+        The matrix of the graph with every edge reversed, so row i holds the
+        edges that lead into node i.
+        """
+        if self._transposed is None:
+            self._transposed = [list(column) for column in zip(*self.matrix)]
+        return self._transposed
+
+    def set_edge(self, source: int, target: int, cost: Optional[float]):
+        """
+        Sets the cost of the edge from source to target, or removes it when cost is None,
+        and calls mark_changed so cached views of the graph and CachedProblem wrappers are
+        not left serving the old edges.
+        """
+        self.matrix[source][target] = cost
+        self.mark_changed()
+
+    def mark_changed(self):
+        """Call after editing matrix in place, so cached views of the graph are rebuilt."""
+        super().mark_changed()
+        self._transposed = None
+        self._csr = None
+
+    def num_states(self):
+        return len(self.matrix)
+
+    def state_to_id(self, state):
+        return state
+
+    def id_to_state(self, state_id):
+        return state_id
+
+    def get_successors_batch(self, state_ids):
+        if self._csr is None:
+            sparse = SparseDirectedGraph.from_matrix(self.matrix, self.goal_indices)
+            self._csr = sparse.csr_arrays()
+        return _csr_successors_batch(*self._csr, state_ids)
+
+    def is_goal_batch(self, state_ids):
+        return np.isin(state_ids, list(self.goal_indices))
+
+    def encode_state(self, state):
+        return NODE.pack(state)
+
+    def decode_state(self, data):
+        return NODE.unpack(data)[0]
+
+    def get_predecessors(self, state):
+        row = self.transposed_matrix()[state]
+        predecessors = {}
+        for index, cost in enumerate(row):
+            if cost is not None:
+                predecessors[index] = cost
+        return predecessors
+
+
+class SparseDirectedGraph(SearchProblem[int]):
+    """
+    SparseDirectedGraph holds a directed graph in compressed sparse row (CSR) form: the edges
+    leaving node i are targets[offsets[i]:offsets[i + 1]], with matching weights. Memory is
+    O(V + E) and get_successors is O(out-degree), instead of O(V^2) and O(V) for DirectedGraph.
+
+    SparseDirectedGraph implements the same SearchProblem interface as DirectedGraph. A state is
+    an integer node index, and get_successors returns a {successor: cost} dictionary.
+    """
+
+    def __init__(
+        self,
+        offsets: Sequence[int],
+        targets: Sequence[int],
+        weights: Sequence[float],
+        goal_indices: Set[int],
+        start_state: int = 0,
+    ):
+        """
+        offsets - len(offsets) is the number of nodes + 1; the edges leaving node i are
+                  stored at positions offsets[i] to offsets[i + 1] - 1 of targets and weights
+
+        targets - the node each edge leads to
+
+        weights - the cost of each edge
+
+        goal_indices - a Python set of the indices of the states
+                       that are goal states.
+
+        start_state - the index of the start state. 0 by default.
+        """
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.goal_indices = goal_indices
+        self.start_state = start_state
+        self._transposed = None  # built on the first predecessor lookup
+        self._csr = None  # NumPy views of offsets and targets, for batched lookups
+
+    @classmethod
+    def from_edges(
+        cls,
+        num_nodes: int,
+        edges: Iterable[Tuple[int, int, float]],
+        goal_indices: Set[int],
+        start_state: int = 0,
+    ) -> "SparseDirectedGraph":
+        """
+        Builds a graph from (source, target, cost) edges in any order. If an edge is listed
+        more than once, get_successors reports the cheapest.
+        """
+        # most expensive first, so the cheapest copy of a repeated edge is the one that
+        # get_successors sees last
+        edges = sorted(edges, key=itemgetter(2), reverse=True)
+        sources = array("q", [edge[0] for edge in edges])
+        targets = array("q", [edge[1] for edge in edges])
+        weights = array("d", [edge[2] for edge in edges])
+        offsets, targets, weights = _build_csr(num_nodes, sources, targets, weights)
+        return cls(offsets, targets, weights, goal_indices, start_state)
+
+    @classmethod
+    def from_matrix(
+        cls,
+        matrix: List[List[Optional[float]]],
+        goal_indices: Set[int],
+        start_state: int = 0,
+    ) -> "SparseDirectedGraph":
+        """Builds a graph from the same adjacency matrix that DirectedGraph takes."""
+        offsets = array("q", [0])
+        targets = array("q")
+        weights = array("d")
+        for row in matrix:
+            for index, cost in enumerate(row):
+                if cost is not None:
+                    targets.append(index)
+                    weights.append(cost)
+            offsets.append(len(targets))
+        return cls(offsets, targets, weights, goal_indices, start_state)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def get_start_state(self):
+        return self.start_state
+
+    def is_goal_state(self, state):
+        return state in self.goal_indices
+
+    def get_successors(self, state):
+        start, end = self.offsets[state], self.offsets[state + 1]
+        return dict(zip(self.targets[start:end], self.weights[start:end]))
+
+    def get_goal_states(self):
+        return self.goal_indices
+
+    def transposed(self) -> Tuple[Sequence[int], Sequence[int], Sequence[float]]:
+        """
+        The (offsets, targets, weights) arrays of the graph with every edge reversed, so the
+        edges of node i are the edges that lead into it.
+        """
+        if self._transposed is None:
+            sources = array("q")
+            for node in range(self.num_nodes):
+                sources.extend([node] * (self.offsets[node + 1] - self.offsets[node]))
+            self._transposed = _build_csr(self.num_nodes, array("q", self.targets), sources, array("d", self.weights))
+        return self._transposed
+
+    def get_predecessors(self, state):
+        offsets, sources, weights = self.transposed()
+        start, end = offsets[state], offsets[state + 1]
+        return dict(zip(sources[start:end], weights[start:end]))
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The offsets and targets arrays as NumPy arrays: views, not copies, when they are int64
+        buffers (arrays of 'q' or memoryviews of a graph file), and converted copies otherwise.
+        """
+        if self._csr is None:
+            self._csr = (np.asarray(self.offsets, dtype=np.int64), np.asarray(self.targets, dtype=np.int64))
+        return self._csr
+
+    def num_states(self):
+        return self.num_nodes
+
+    def state_to_id(self, state):
+        return state
+
+    def id_to_state(self, state_id):
+        return state_id
+
+    def get_successors_batch(self, state_ids):
+        return _csr_successors_batch(*self.csr_arrays(), state_ids)
+
+    def is_goal_batch(self, state_ids):
+        return np.isin(state_ids, list(self.goal_indices))
+
+    def encode_state(self, state):
+        return NODE.pack(state)
+
+    def decode_state(self, data):
+        return NODE.unpack(data)[0]
+
+
+def _build_csr(num_nodes: int, sources: array, targets: array, weights: array) -> Tuple[array, array, array]:
+    """
+    Groups edges by source with a counting sort, keeping the order of edges that share a
+    source, and returns the CSR (offsets, targets, weights) arrays.
+    """
+    counts = [0] * (num_nodes + 1)
+    for source in sources:
+        counts[source + 1] += 1
+    offsets = array("q", accumulate(counts))
+    next_slot = list(offsets[:-1])
+    sorted_targets = array("q", bytes(8 * len(targets)))
+    sorted_weights = array("d", bytes(8 * len(weights)))
+    for source, target, weight in zip(sources, targets, weights):
+        slot = next_slot[source]
+        sorted_targets[slot] = target
+        sorted_weights[slot] = weight
+        next_slot[source] = slot + 1
+    return offsets, sorted_targets, sorted_weights
+
+
+def _csr_successors_batch(offsets: np.ndarray, targets: np.ndarray, state_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gathers every edge leaving the given nodes of a CSR graph, as (sources, targets) arrays.
+    """
+    starts = offsets[state_ids]
+    counts = offsets[state_ids + 1] - starts
+    sources = np.repeat(state_ids, counts)
+    # position of each edge within its node's run, added to where that run starts
+    run_starts = np.cumsum(counts) - counts
+    positions = np.arange(counts.sum()) - np.repeat(run_starts - starts, counts)
+    return sources, targets[positions]
@@ -0,0 +1,240 @@
+# Breadth-first search for state spaces too big to keep in memory.
+#
+# external_bfs keeps nothing but a bounded buffer of states in memory. Each BFS layer lives in a
+# file of (state, parent) records sorted by state, where states are the bytes produced by the
+# problem's encode_state. Expanding a layer streams its file and collects the successors in the
+# buffer; whenever the buffer outgrows the memory budget it is sorted and written out as a run.
+# The runs are then merged, which brings copies of the same state together so that duplicates
+# are dropped, and states already in the visited file (every earlier layer, also sorted) are
+# dropped by a second merge against it. This is delayed duplicate detection: instead of looking
+# up each successor in a hash table as bfs does, whole sorted files are compared at once.
+#
+# A record is a 4-byte little-endian length for each of the two byte strings, followed by the
+# state and then the parent (empty for the start state).
+
+import heapq
+import os
+import struct
+import tempfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from search_hooks import SearchHooks
+from search_problem import SearchProblem, State
+
+RECORD_HEADER = struct.Struct("<II")
+# a rough count of the bytes Python spends on each buffered record besides the encodings
+# themselves (a tuple and two bytes objects)
+RECORD_OVERHEAD = 150
+
+
+def write_records(file: BinaryIO, records: Iterable[Tuple[bytes, bytes]]) -> int:
+    """
+    Writes (state, parent) records to a file.
+
+    Returns:
+        int: The number of records written.
+    """
+    written = 0
+    for state, parent in records:
+        file.write(RECORD_HEADER.pack(len(state), len(parent)))
+        file.write(state)
+        file.write(parent)
+        written += 1
+    return written
+
+
+def read_records(path: str) -> Iterator[Tuple[bytes, bytes]]:
+    """Streams the (state, parent) records of a file written with write_records."""
+    with open(path, "rb", buffering=1 << 20) as file:
+        while True:
+            header = file.read(RECORD_HEADER.size)
+            if not header:
+                return
+            state_size, parent_size = RECORD_HEADER.unpack(header)
+            yield file.read(state_size), file.read(parent_size)
+
+
+def _unique(records: Iterable[Tuple[bytes, bytes]], on_duplicate=None) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Drops all but the first of each run of records with the same state, from sorted records,
+    calling on_duplicate (if given) with each record dropped.
+    """
+    previous = None
+    for record in records:
+        if record[0] != previous:
+            previous = record[0]
+            yield record
+        elif on_duplicate is not None:
+            on_duplicate(record)
+
+
+def _subtract(records: Iterable[Tuple[bytes, bytes]], visited: Iterable[Tuple[bytes, bytes]], on_duplicate=None) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Drops the records whose state is in visited, calling on_duplicate (if given) with each
+    record dropped. Both must be sorted by state.
+    """
+    visited = iter(visited)
+    seen = next(visited, None)
+    for record in records:
+        while seen is not None and seen[0] < record[0]:
+            seen = next(visited, None)
+        if seen is None or seen[0] != record[0]:
+            yield record
+        elif on_duplicate is not None:
+            on_duplicate(record)
+
+
+def external_bfs(problem: SearchProblem[State], memory_limit: int = 64 << 20, temp_dir: Optional[str] = None,
+                 reversible: bool = False, hooks: Optional[SearchHooks] = None) -> Tuple[Optional[List[State]], Dict[str, int]]:
+    """
+    Performs Breadth-First Search with the frontier and visited states kept in sorted files on
+    disk rather than in memory, so the search is limited by disk space instead of RAM.
+
+    The problem must implement encode_state and decode_state. Like bfs, the returned path is a
+    shortest path, though not necessarily the same one bfs finds, since each layer is expanded
+    in the order of the encoded states.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        memory_limit (int): Roughly how many bytes of successors to buffer before sorting them
+            and writing them out as a run.
+        temp_dir (Optional[str]): Where to create the working directory for the layer, run and
+            visited files; the system's temporary directory by default. It is deleted afterwards.
+        reversible (bool): Set when every move can be undone, as in mazes. Then a successor of
+            a state in layer d can only already be in layer d or d - 1, so new layers are checked
+            against just those two files and no visited file is kept. Without this, the visited
+            file is rewritten after every layer, which makes deep searches slow.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py). on_duplicate is called as duplicates are dropped in the merges.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]:
+            - A list of states representing a shortest solution path, or None if no solution was found.
+            - A dictionary of search statistics with the same keys as bfs ('max_frontier_size'
+              is the largest layer) plus:
+                a. 'layers': The number of layers expanded.
+                b. 'runs_written': The number of sorted runs spilled to disk.
+                c. 'records_written': The number of records written to all files.
+    """
+    stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0,
+             "layers": 0, "runs_written": 0, "records_written": 0}
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    encode, decode = problem.encode_state, problem.decode_state
+    on_duplicate = None
+    if hooks is not None:
+        def on_duplicate(record):
+            hooks.on_duplicate(decode(record[0]), decode(record[1]))
+    with tempfile.TemporaryDirectory(prefix="external_bfs_", dir=temp_dir) as directory:
+        def layer_path(depth):
+            return os.path.join(directory, f"layer_{depth}.bin")
+
+        visited_path = os.path.join(directory, "visited_0.bin")
+        start_record = (encode(problem.get_start_state()), b"")
+        for path in (layer_path(0),) if reversible else (layer_path(0), visited_path):
+            with open(path, "wb") as file:
+                stats["records_written"] += write_records(file, [start_record])
+        stats["max_frontier_size"] = 1
+        depth = 0
+        while True:
+            goal, run_paths = _expand_layer(problem, layer_path(depth), directory, memory_limit, stats, hooks, on_duplicate)
+            if goal is not None:
+                path = _trace_path(problem, goal, depth, layer_path)
+                stats["path_length"] = len(path)
+                if hooks is not None:
+                    hooks.on_goal(path[-1])
+                    hooks.on_finish(stats)
+                return path, stats
+            stats["layers"] += 1
+            if not run_paths:
+                break
+            # merge the runs into the next layer, without duplicates or already visited states
+            merged = _unique(heapq.merge(*(read_records(run) for run in run_paths)), on_duplicate)
+            if reversible:
+                seen = heapq.merge(*(read_records(layer_path(layer)) for layer in range(max(0, depth - 1), depth + 1)))
+            else:
+                seen = read_records(visited_path)
+            new_records = _subtract(merged, seen, on_duplicate)
+            with open(layer_path(depth + 1), "wb") as file:
+                layer_size = write_records(file, new_records)
+            stats["records_written"] += layer_size
+            for run in run_paths:
+                os.remove(run)
+            if not layer_size:
+                break
+            stats["max_frontier_size"] = max(stats["max_frontier_size"], layer_size)
+            if reversible:
+                depth += 1
+                continue
+            # the new visited file is the old one plus the new layer, merged
+            next_visited_path = os.path.join(directory, f"visited_{depth + 1}.bin")
+            with open(next_visited_path, "wb") as file:
+                stats["records_written"] += write_records(file, (
+                    (state, b"") for state, _ in heapq.merge(read_records(visited_path), read_records(layer_path(depth + 1)))))
+            os.remove(visited_path)
+            visited_path = next_visited_path
+            depth += 1
+    if hooks is not None:
+        hooks.on_finish(stats)
+    return None, stats
+
+
+def _expand_layer(problem, path, directory, memory_limit, stats, hooks, on_duplicate):
+    """
+    Expands every state in a layer file, spilling the successors to sorted run files.
+
+    Returns the encoding of the first goal state found in the layer (or None) and the paths of
+    the runs written.
+    """
+    encode, decode = problem.encode_state, problem.decode_state
+    run_paths = []
+    buffer = []
+    buffered_bytes = 0
+    for encoded, _ in read_records(path):
+        state = decode(encoded)
+        if problem.is_goal_state(state):
+            for run in run_paths:
+                os.remove(run)
+            return encoded, []
+        if hooks is not None:
+            hooks.on_expand(state)
+        for successor in problem.get_successors(state):
+            if hooks is not None:
+                hooks.on_generate(successor, state)
+            encoded_successor = encode(successor)
+            buffer.append((encoded_successor, encoded))
+            buffered_bytes += len(encoded_successor) + len(encoded) + RECORD_OVERHEAD
+        stats["states_expanded"] += 1
+        if buffered_bytes >= memory_limit:
+            run_paths.append(_write_run(buffer, directory, len(run_paths), stats, on_duplicate))
+            buffer = []
+            buffered_bytes = 0
+    if buffer:
+        run_paths.append(_write_run(buffer, directory, len(run_paths), stats, on_duplicate))
+    return None, run_paths
+
+
+def _write_run(buffer, directory, number, stats, on_duplicate):
+    """Sorts a buffer of records, drops duplicate states and writes it out as a run file."""
+    buffer.sort()
+    path = os.path.join(directory, f"run_{number}.bin")
+    with open(path, "wb") as file:
+        stats["records_written"] += write_records(file, _unique(buffer, on_duplicate))
+    stats["runs_written"] += 1
+    return path
+
+
+def _trace_path(problem, goal, depth, layer_path):
+    """
+    Rebuilds the path to a goal found in layer depth by looking up each state's parent in its
+    layer file, one layer at a time back to the start.
+    """
+    reverse_path = [goal]
+    for layer in range(depth, 0, -1):
+        state = reverse_path[-1]
+        for encoded, parent in read_records(layer_path(layer)):
+            if encoded == state:
+                reverse_path.append(parent)
+                break
+    reverse_path.reverse()
+    return [problem.decode_state(encoded) for encoded in reverse_path]
@@ -0,0 +1,186 @@
+# An on-disk CSR format for SparseDirectedGraph, and a streaming loader for edge lists.
+#
+# The file starts with a fixed header (see HEADER) holding the magic bytes, the format
+# version, the number of nodes V and the number of edges E. It is followed by three
+# little-endian arrays: V + 1 int64 offsets, E int64 targets and E float64 weights, laid out
+# exactly like the arrays of SparseDirectedGraph, so a graph file can be searched straight from
+# a memory map (on little-endian machines, which is all of the ones we run on).
+#
+# Edge lists are either text, one "source target [weight]" edge per line (blank lines and lines
+# starting with # are skipped, the weight defaults to 1), or binary, a sequence of EDGE_RECORD
+# records.
+
+import mmap
+import struct
+from typing import Iterator, Optional, Set, Tuple
+
+import numpy as np
+
+from directed_graph import SparseDirectedGraph
+
+MAGIC = b"CSRG"
+VERSION = 1
+# magic, version, number of nodes, number of edges
+HEADER = struct.Struct("<4sIQQ")
+# source, target, weight
+EDGE_RECORD = np.dtype([("source", "<i8"), ("target", "<i8"), ("weight", "<f8")])
+
+
+def read_edge_chunks(edge_path: str, binary: bool = False, chunk_edges: int = 1 << 20) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Streams an edge list in chunks of at most chunk_edges edges.
+
+    Args:
+        edge_path (str): The edge list to read.
+        binary (bool): True if the file holds EDGE_RECORD records rather than text.
+        chunk_edges (int): The maximum number of edges held in memory at once.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The sources, targets and weights of a chunk.
+    """
+    if binary:
+        with open(edge_path, "rb") as file:
+            while True:
+                records = np.fromfile(file, dtype=EDGE_RECORD, count=chunk_edges)
+                if not records.size:
+                    return
+                yield records["source"], records["target"], records["weight"]
+    with open(edge_path, "r") as file:
+        while True:
+            sources, targets, weights = [], [], []
+            for line in file:
+                fields = line.split()
+                if not fields or fields[0].startswith("#"):
+                    continue
+                sources.append(int(fields[0]))
+                targets.append(int(fields[1]))
+                weights.append(float(fields[2]) if len(fields) > 2 else 1.0)
+                if len(sources) == chunk_edges:
+                    break
+            if not sources:
+                return
+            yield np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64), np.array(weights, dtype=np.float64)
+
+
+def build_graph_file(edge_path: str, graph_path: str, binary: bool = False, num_nodes: Optional[int] = None, chunk_edges: int = 1 << 20) -> Tuple[int, int]:
+    """
+    Converts an edge list into a graph file in two streaming passes.
+
+    The first pass counts the out-degree of every node, which fixes the offsets array. The
+    second pass writes every edge into the next free slot of its source node, directly into the
+    memory-mapped output file. Apart from the chunk being processed, only O(V) counters are kept
+    in memory, however many edges there are. A final pass then sorts the edges of each source
+    from most to least expensive, a chunk of sources at a time, so that, as with
+    SparseDirectedGraph.from_edges, get_successors reports the cheapest copy of a repeated edge.
+
+    Args:
+        edge_path (str): The edge list to read.
+        graph_path (str): The graph file to write.
+        binary (bool): True if the edge list holds EDGE_RECORD records rather than text.
+        num_nodes (Optional[int]): The number of nodes; by default, one more than the largest
+            node index in the edge list.
+        chunk_edges (int): The maximum number of edges held in memory at once.
+
+    Returns:
+        Tuple[int, int]: The number of nodes and edges written.
+    """
+    degrees = np.zeros(num_nodes or 0, dtype=np.int64)
+    for sources, targets, _ in read_edge_chunks(edge_path, binary, chunk_edges):
+        if sources.min() < 0 or targets.min() < 0:
+            raise ValueError("Node indices must not be negative")
+        largest = int(max(sources.max(), targets.max())) + 1
+        if largest > len(degrees):
+            if num_nodes is not None:
+                raise ValueError(f"Edge list mentions node {largest - 1} but num_nodes is {num_nodes}")
+            degrees = np.concatenate([degrees, np.zeros(largest - len(degrees), dtype=np.int64)])
+        degrees += np.bincount(sources, minlength=len(degrees))
+    node_count = len(degrees)
+    edge_count = int(degrees.sum())
+
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(degrees, out=offsets[1:])
+    del degrees
+    file_size = HEADER.size + 8 * (node_count + 1) + 16 * edge_count
+    with open(graph_path, "w+b") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, node_count, edge_count))
+        file.write(offsets.tobytes())
+        file.truncate(file_size)
+        if edge_count:
+            buffer = mmap.mmap(file.fileno(), file_size)
+            out_targets, out_weights = _edge_arrays(buffer, node_count, edge_count)
+            next_slot = offsets[:-1].copy()
+            for sources, targets, weights in read_edge_chunks(edge_path, binary, chunk_edges):
+                # place the edges of each source in order after those from earlier chunks
+                order = np.argsort(sources, kind="stable")
+                sources = sources[order]
+                group_starts = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]])
+                group_sizes = np.diff(np.r_[group_starts, len(sources)])
+                rank = np.arange(len(sources)) - np.repeat(group_starts, group_sizes)
+                slots = next_slot[sources] + rank
+                out_targets[slots] = targets[order]
+                out_weights[slots] = weights[order]
+                next_slot[sources[group_starts]] += group_sizes
+            _sort_runs_by_weight(offsets, out_targets, out_weights, chunk_edges)
+            del out_targets, out_weights
+            buffer.flush()
+            buffer.close()
+    return node_count, edge_count
+
+
+def _sort_runs_by_weight(offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray, chunk_edges: int):
+    """
+    Sorts the edges of every source by descending weight, in place, the edges of whole sources
+    at a time and about chunk_edges edges per step (more if one source has more edges).
+    """
+    node_count = len(offsets) - 1
+    first = 0
+    while first < node_count:
+        last = int(np.searchsorted(offsets, offsets[first] + chunk_edges, side="right")) - 1
+        last = min(max(last, first + 1), node_count)
+        low, high = offsets[first], offsets[last]
+        sources = np.repeat(np.arange(first, last), np.diff(offsets[first:last + 1]))
+        # by source, then most expensive first; lexsort sorts by the last key first
+        order = np.lexsort((-weights[low:high], sources))
+        targets[low:high] = targets[low:high][order]
+        weights[low:high] = weights[low:high][order]
+        first = last
+
+
+def _edge_arrays(buffer, node_count: int, edge_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The targets and weights arrays inside a mapped graph file."""
+    targets_at = HEADER.size + 8 * (node_count + 1)
+    weights_at = targets_at + 8 * edge_count
+    targets = np.frombuffer(buffer, dtype="<i8", count=edge_count, offset=targets_at)
+    weights = np.frombuffer(buffer, dtype="<f8", count=edge_count, offset=weights_at)
+    return targets, weights
+
+
+def open_graph_file(graph_path: str, goal_indices: Set[int], start_state: int = 0) -> SparseDirectedGraph:
+    """
+    Opens a graph file as a SparseDirectedGraph without reading it: the arrays are views of a
+    read-only memory map, and the operating system pages in the parts that searches touch.
+
+    Args:
+        graph_path (str): The graph file written by build_graph_file.
+        goal_indices (Set[int]): The indices of the goal states.
+        start_state (int): The index of the start state.
+
+    Returns:
+        SparseDirectedGraph: The graph stored in the file.
+    """
+    with open(graph_path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, node_count, edge_count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a graph file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported graph file version {version}")
+    if len(buffer) < HEADER.size + 8 * (node_count + 1) + 16 * edge_count:
+        raise ValueError("Graph file is truncated")
+    # memoryviews index to plain Python ints and floats, which keeps get_successors fast
+    view = memoryview(buffer)
+    offsets = view[HEADER.size:HEADER.size + 8 * (node_count + 1)].cast("q")
+    targets_at = HEADER.size + 8 * (node_count + 1)
+    targets = view[targets_at:targets_at + 8 * edge_count].cast("q")
+    weights = view[targets_at + 8 * edge_count:targets_at + 16 * edge_count].cast("d")
+    return SparseDirectedGraph(offsets, targets, weights, goal_indices, start_state)
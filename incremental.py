@@ -0,0 +1,170 @@
+# Incremental replanning on a maze whose walls change between searches.
+#
+# IncrementalPlanner runs Lifelong Planning A* (LPA*, Koenig, Likhachev and Furcy 2004). Like
+# A*, it keeps g, the best known distance from the start to each state, but also rhs, the
+# distance that the g values of a state's neighbours say it should have. A state whose g and rhs
+# differ is inconsistent and waits on the priority queue; a search ends once no inconsistent
+# state could still change the goal's distance. When a wall opens or closes, only the rhs values
+# of the two rooms beside it change, so the next search starts from just those rooms and repairs
+# the g values downstream of them instead of starting over.
+
+import heapq
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from maze import Maze, MazeState, DIRECTION_OFFSETS
+from search import astar, manhattan_heuristic
+
+INFINITY = float("inf")
+
+
+class IncrementalPlanner:
+    """
+    Keeps a shortest path from a maze's start to its goal up to date as walls are opened and
+    closed. Every move costs 1 and the Manhattan distance guides the search, as with astar.
+
+    The planner owns the walls of the maze while it is in use: make changes through update_walls,
+    which sets them with Maze.set_wall and repairs the planner's distances, rather than on the
+    maze directly.
+
+    Attributes:
+        maze (Maze): The maze being planned on.
+        replans (int): The number of searches so far, including the first.
+        initial_states_expanded (int): The number of states the first, from-scratch, search expanded.
+    """
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.start = maze.get_start_state()
+        self.goal = maze.goal_state
+        self.replans = 0
+        self.initial_states_expanded = None
+        self._g = {}
+        self._rhs = {self.start: 0}
+        # the priority queue holds (key, counter, state) entries; _queued holds the current key of
+        # every state on it, and entries whose key differs are stale and skipped when popped
+        self._queue = []
+        self._queued = {}
+        self._counter = count()
+        self._push(self.start)
+
+    def _key(self, state: MazeState) -> Tuple[float, float]:
+        best = min(self._g.get(state, INFINITY), self._rhs.get(state, INFINITY))
+        return (best + manhattan_heuristic(state, self.maze), best)
+
+    def _push(self, state: MazeState):
+        key = self._key(state)
+        self._queued[state] = key
+        heapq.heappush(self._queue, (key, next(self._counter), state))
+
+    def _update_state(self, state: MazeState):
+        """Recomputes the rhs of a state and queues it if it is inconsistent."""
+        if state != self.start:
+            self._rhs[state] = min((self._g.get(neighbor, INFINITY) + 1 for neighbor in self.maze.get_successors(state)),
+                                   default=INFINITY)
+        if self._g.get(state, INFINITY) != self._rhs.get(state, INFINITY):
+            self._push(state)
+        else:
+            self._queued.pop(state, None)
+
+    def _top_key(self) -> Tuple[float, float]:
+        queue, queued = self._queue, self._queued
+        while queue:
+            key, _, state = queue[0]
+            if queued.get(state) == key:
+                return key
+            heapq.heappop(queue)  # stale entry
+        return (INFINITY, INFINITY)
+
+    def _compute_shortest_path(self) -> int:
+        expanded = 0
+        goal = self.goal
+        while self._top_key() < self._key(goal) or self._rhs.get(goal, INFINITY) != self._g.get(goal, INFINITY):
+            if not self._queue:
+                break
+            _, _, state = heapq.heappop(self._queue)
+            del self._queued[state]
+            expanded += 1
+            g, rhs = self._g.get(state, INFINITY), self._rhs.get(state, INFINITY)
+            if g > rhs:
+                # overconsistent: the state got closer, which settles it like an A* expansion
+                self._g[state] = rhs
+            else:
+                # underconsistent: the state got farther; forget its distance and let its
+                # neighbours tell it the new one
+                self._g[state] = INFINITY
+                self._update_state(state)
+            for neighbor in self.maze.get_successors(state):
+                self._update_state(neighbor)
+        return expanded
+
+    def update_walls(self, changes: Iterable[Tuple[int, int, str, bool]]):
+        """
+        Opens or closes walls. A wall belongs to the rooms on both sides of it, so both rooms
+        are updated. The next replan repairs the path.
+
+        Args:
+            changes (Iterable[Tuple[int, int, str, bool]]): (row, col, direction, closed) for each
+                wall to change, e.g. (3, 4, "east", True) closes the east wall of room (3, 4).
+        """
+        maze = self.maze
+        touched = []
+        for row, col, direction, closed in changes:
+            maze.set_wall(row, col, direction, closed)
+            d_row, d_col = DIRECTION_OFFSETS[direction]
+            touched.append((row, col))
+            if maze.is_in_bounds(row + d_row, col + d_col):
+                touched.append((row + d_row, col + d_col))
+        for row, col in touched:
+            self._update_state(maze.get_state(row, col))
+
+    def replan(self, compare: bool = False) -> Tuple[Optional[List[MazeState]], Dict[str, int]]:
+        """
+        Brings the shortest path up to date with the walls, repairing only what the changes since
+        the last replan affected. The first call plans from scratch.
+
+        Args:
+            compare (bool): Also solve the maze from scratch with astar and the Manhattan
+                heuristic, to report how many states that would have expanded.
+
+        Returns:
+            Tuple[Optional[List[MazeState]], Dict[str, int]]:
+                - A shortest path from the start to the goal, or None if the goal cannot be reached.
+                - A dictionary of statistics, including:
+                    a. 'path_length': The length of the path.
+                    b. 'states_expanded': The number of states expanded (or re-expanded) by this replan.
+                    c. 'initial_states_expanded': The number expanded by the first, from-scratch replan.
+                    d. 'replans': The number of replans so far, including this one.
+                    e. 'full_search_states_expanded' (only with compare): The number astar expanded.
+        """
+        expanded = self._compute_shortest_path()
+        self.replans += 1
+        if self.initial_states_expanded is None:
+            self.initial_states_expanded = expanded
+        stats = {"path_length": 0, "states_expanded": expanded,
+                 "initial_states_expanded": self.initial_states_expanded, "replans": self.replans}
+        if compare:
+            stats["full_search_states_expanded"] = astar(self.maze, manhattan_heuristic)[1]["states_expanded"]
+        path = self.path()
+        if path is not None:
+            stats["path_length"] = len(path)
+        return path, stats
+
+    def path(self) -> Optional[List[MazeState]]:
+        """
+        Reads the shortest path found by the last replan off the g values, by walking back from
+        the goal to a neighbour one move closer to the start each time.
+
+        Returns:
+            Optional[List[MazeState]]: The path from the start to the goal, or None if there is none.
+        """
+        g = self._g
+        distance = g.get(self.goal, INFINITY)
+        if distance == INFINITY:
+            return None
+        reverse_path = [self.goal]
+        while reverse_path[-1] != self.start:
+            distance -= 1
+            reverse_path.append(next(neighbor for neighbor in self.maze.get_successors(reverse_path[-1])
+                                     if g.get(neighbor, INFINITY) == distance))
+        reverse_path.reverse()
+        return reverse_path
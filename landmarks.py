@@ -0,0 +1,167 @@
+# Landmark (ALT: A*, landmarks and the triangle inequality) heuristics for repeated queries.
+#
+# For a landmark L and any two states v and t, the triangle inequality gives
+#
+#     d(v, t) >= d(L, t) - d(L, v)    and    d(v, t) >= d(v, L) - d(t, L)
+#
+# so once the distances from and to a few landmarks have been computed for every state, the
+# largest of these bounds is an admissible (and consistent) heuristic towards any goal t. It works
+# on any graph, with or without loops, and unlike manhattan_heuristic it knows about walls.
+
+import heapq
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from search import weighted_predecessors, weighted_successors
+from search_problem import SearchProblem, State
+
+
+class LandmarkIndex:
+    """
+    Distances from and to k landmark states, for every state of a problem, and the A* heuristic
+    they give.
+
+    The problem must number its states (num_states, state_to_id and id_to_state) and implement
+    get_predecessors. Edge costs are read as in ucs. Distances between states that cannot reach
+    each other are stored as infinity.
+
+    Attributes:
+        problem (SearchProblem[State]): The indexed problem.
+        landmarks (np.ndarray): The state numbers of the landmarks.
+        forward (np.ndarray): A (num_states, k) array; forward[v, i] is the distance from
+            landmark i to state v.
+        backward (np.ndarray): A (num_states, k) array; backward[v, i] is the distance from
+            state v to landmark i.
+    """
+    def __init__(self, problem: SearchProblem[State], k: int = 8, first: Optional[State] = None,
+                 landmarks: Optional[np.ndarray] = None, forward: Optional[np.ndarray] = None,
+                 backward: Optional[np.ndarray] = None):
+        """
+        problem - the problem to index
+
+        k - the number of landmarks to pick
+
+        first - the first landmark; the start state by default. Each further landmark is the
+                state farthest from the landmarks picked so far.
+
+        landmarks, forward, backward - precomputed tables, as restored by load
+        """
+        self.problem = problem
+        num_states = problem.num_states()
+        if num_states is None:
+            raise ValueError(f"{type(problem).__name__} does not number its states")
+        if landmarks is not None:
+            if forward.shape != (num_states, len(landmarks)) or backward.shape != forward.shape:
+                raise ValueError("The landmark tables do not match the problem's number of states")
+            self.landmarks, self.forward, self.backward = landmarks, forward, backward
+            return
+        k = min(k, num_states)
+        self.landmarks = np.empty(k, dtype=np.int64)
+        self.forward = np.empty((num_states, k))
+        self.backward = np.empty((num_states, k))
+        # the distance from each state to the nearest landmark picked so far, either way round
+        nearest = np.full(num_states, np.inf)
+        landmark = problem.state_to_id(problem.get_start_state() if first is None else first)
+        for i in range(k):
+            self.landmarks[i] = landmark
+            self.forward[:, i] = self._distances(landmark, weighted_successors)
+            self.backward[:, i] = self._distances(landmark, weighted_predecessors)
+            nearest = np.minimum(nearest, np.minimum(self.forward[:, i], self.backward[:, i]))
+            nearest[self.landmarks[:i + 1]] = -1
+            # states no landmark can reach, or be reached from, are the farthest of all
+            landmark = int(np.argmax(nearest))
+
+    def _distances(self, source_id: int, neighbors: Callable) -> np.ndarray:
+        """Dijkstra's algorithm from one state, following neighbors (weighted_successors or
+        weighted_predecessors). Produces the distance to every state, by state number."""
+        problem = self.problem
+        distances = np.full(problem.num_states(), np.inf)
+        best = {source_id: 0}
+        frontier = [(0, source_id)]
+        while frontier:
+            distance, state_id = heapq.heappop(frontier)
+            if distance > best[state_id]:
+                continue  # stale entry left behind by a shorter route
+            distances[state_id] = distance
+            for neighbor, cost in neighbors(problem, problem.id_to_state(state_id)):
+                neighbor_id = problem.state_to_id(neighbor)
+                new_distance = distance + cost
+                if neighbor_id not in best or new_distance < best[neighbor_id]:
+                    best[neighbor_id] = new_distance
+                    heapq.heappush(frontier, (new_distance, neighbor_id))
+        return distances
+
+    def lower_bound(self, state: State, goal: State) -> float:
+        """
+        The landmark lower bound on the distance from state to goal.
+
+        Returns:
+            float: A distance no longer than the shortest path; infinity if the landmarks show
+            that goal cannot be reached from state.
+        """
+        return self.heuristic([goal])(state, self.problem)
+
+    def heuristic(self, goals: Optional[Iterable[State]] = None) -> Callable[[State, SearchProblem[State]], float]:
+        """
+        Makes an A* heuristic towards the given goals, e.g.
+        astar(problem, index.heuristic()).
+
+        Args:
+            goals (Optional[Iterable[State]]): The goal states; the problem's get_goal_states
+                by default. With several goals the estimate is the smallest of their bounds.
+
+        Returns:
+            Callable[[State, SearchProblem[State]], float]: The heuristic.
+        """
+        if goals is None:
+            goals = self.problem.get_goal_states()
+        to_id = self.problem.state_to_id
+        goal_ids = [to_id(goal) for goal in goals]
+        goal_forward = [self.forward[goal_id].tolist() for goal_id in goal_ids]
+        goal_backward = [self.backward[goal_id].tolist() for goal_id in goal_ids]
+        forward, backward = self.forward, self.backward
+
+        def landmark_heuristic(state: State, problem: SearchProblem[State]) -> float:
+            state_id = to_id(state)
+            state_forward = forward[state_id].tolist()
+            state_backward = backward[state_id].tolist()
+            estimate = None
+            for to_goal, from_goal in zip(goal_forward, goal_backward):
+                bound = 0
+                # infinity minus infinity is NaN, which never compares greater and so is skipped
+                for landmark_to_goal, landmark_to_state in zip(to_goal, state_forward):
+                    if landmark_to_goal - landmark_to_state > bound:
+                        bound = landmark_to_goal - landmark_to_state
+                for state_to_landmark, goal_to_landmark in zip(state_backward, from_goal):
+                    if state_to_landmark - goal_to_landmark > bound:
+                        bound = state_to_landmark - goal_to_landmark
+                if estimate is None or bound < estimate:
+                    estimate = bound
+            return estimate if estimate is not None else 0
+        return landmark_heuristic
+
+    def save(self, path: str):
+        """
+        Saves the landmark tables to a NumPy .npz file, so they can be loaded again for the
+        same problem without recomputing them.
+
+        Args:
+            path (str): The file to write; NumPy adds .npz to the name if it is missing.
+        """
+        np.savez(path, landmarks=self.landmarks, forward=self.forward, backward=self.backward)
+
+    @classmethod
+    def load(cls, path: str, problem: SearchProblem[State]) -> "LandmarkIndex":
+        """
+        Loads landmark tables written by save.
+
+        Args:
+            path (str): The file to read.
+            problem (SearchProblem[State]): The problem the tables were computed for.
+
+        Returns:
+            LandmarkIndex: The index, ready to make heuristics.
+        """
+        with np.load(path) as tables:
+            return cls(problem, landmarks=tables["landmarks"], forward=tables["forward"], backward=tables["backward"])
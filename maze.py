@@ -1,14 +1,34 @@
-from typing import Tuple, Optional, Dict
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict
 import random
+import struct
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from search_problem import SearchProblem
 
+# Bits used when a room's walls are packed into a single 4-bit mask
+NORTH, SOUTH, EAST, WEST = 1, 2, 4, 8
+DIRECTION_BITS = {'north': NORTH, 'south': SOUTH, 'east': EAST, 'west': WEST}
+ALL_WALLS = NORTH | SOUTH | EAST | WEST
+
+# The (row, col) change of moving one room in each direction
+DIRECTION_OFFSETS = {'north': (-1, 0), 'south': (1, 0), 'east': (0, 1), 'west': (0, -1)}
+
+GENERATION_ALGORITHMS = ('drunken_walk', 'kruskal', 'wilson')
+
+# the (row, col) of a room, as written by Maze.encode_state
+LOCATION = struct.Struct(">II")
+
+
 class MazeRoom:
     """
     Represents a single room or cell in the maze.nEach room has walls on all 
     four sides (north, south, east, west) initially, and a flag indicating 
     whether the room has been visited.
     """
+    # Rooms are allocated once per cell, so __slots__ keeps large boards small
+    __slots__ = ('north', 'south', 'east', 'west', 'visited')
+
     def __init__(self):
         self.north = 1
         self.south = 1
@@ -16,6 +36,33 @@ class MazeRoom:
         self.west = 1
         self.visited = False  # Initially, no room has been visited
 
+    def to_mask(self) -> int:
+        """
+        Packs the room's walls into a 4-bit mask (see NORTH, SOUTH, EAST and WEST).
+
+        Returns:
+            int: The mask with a bit set for every side that has a wall.
+        """
+        return (NORTH * self.north) | (SOUTH * self.south) | (EAST * self.east) | (WEST * self.west)
+
+    @classmethod
+    def from_mask(cls, mask: int) -> "MazeRoom":
+        """
+        Builds a room from a 4-bit wall mask produced by to_mask.
+
+        Args:
+            mask (int): The packed walls of the room.
+
+        Returns:
+            MazeRoom: A room with a wall on every side whose bit is set in mask.
+        """
+        room = cls()
+        room.north = 1 if mask & NORTH else 0
+        room.south = 1 if mask & SOUTH else 0
+        room.east = 1 if mask & EAST else 0
+        room.west = 1 if mask & WEST else 0
+        return room
+
 
 class MazeState:
     """
@@ -25,6 +72,8 @@ class MazeState:
         location (Tuple[int, int]): The current position in the maze.
         board (Tuple[Tuple[MazeRoom]]): The board of rooms that make up the maze.
     """
+    __slots__ = ('location', 'board')
+
     def __init__(self, board: Tuple[Tuple[MazeRoom]], location: Tuple[int, int]):
         self.location = location
         self.board = board
@@ -43,82 +92,305 @@ class Maze(SearchProblem[MazeState]):
     """
     A class representing a maze, which can be used for both maze generation and solving.
 
+    The successors of each room are cached once a search has asked for them, so change walls
+    with set_wall or remove_wall. Editing the MazeRoom objects of the board directly is only
+    seen by the next search after a call to invalidate_successors().
+
     Attributes:
         width (int): The width of the maze.
         height (int): The height of the maze.
         board (List[List[MazeRoom]]): A 2D list representing the maze grid, where each cell is a MazeRoom.
         start_state (MazeState): The starting state of the maze.
         goal_state (MazeState): The goal state of the maze.
+        random (random.Random): The source of randomness used to generate the maze.
 
     Methods:
-        generate_board(): Generates the maze by randomly carving out paths.
-        drunken_walk(row, col): Recursively carves out a maze by randomly walking through the board, removing walls.
+        generate_board(algorithm="drunken_walk"): Generates the maze by randomly carving out paths.
+        drunken_walk(row, col): Carves out a maze by randomly walking through the board, removing walls.
+        kruskal(): Carves out a maze with randomized Kruskal's algorithm.
+        wilson(): Carves out a maze with Wilson's algorithm.
+        remove_wall(row, col, direction): Removes a wall from both of the rooms it separates, for the next search to see.
+        set_wall(row, col, direction, closed): Opens or closes a wall of both rooms, for the next search to see.
+        save(path): Saves the maze to a compact binary file.
+        load(path): Opens a saved maze without reading the whole file.
+        close(): Releases the file of a loaded maze; mazes are also context managers.
         is_in_bounds(row, col): Checks whether a given position is within the bounds of the maze.
         opposite_direction(direction): Returns the opposite direction of the given direction.
         visualize_maze(path=None, algorithm_name=None): Visualizes the maze and optionally overlays a path explored by a search algorithm.
         get_start_state(): Returns the start state of the maze.
         is_goal_state(state): Determines whether the goal state of the maze has been reached.
         get_successors(state): Generates the successor states from the current state in the maze.
+        get_state(row, col): Returns the single shared MazeState for a location.
+        invalidate_successors(locations=None): Forgets cached successors after walls are edited.
+        get_goal_states(): Returns the goal states of the maze.
+        get_predecessors(state): Generates the states that can move into the current state.
+        num_states(), state_to_id(state), id_to_state(state_id): Number the rooms row by row.
+        get_successors_batch(state_ids): Generates every move out of many numbered rooms at once.
     """
-    def __init__(self, width: int, height: int, start: Optional[Tuple[int, int]] = None, goal: Optional[Tuple[int, int]] = None, self_generating=True, board=None):
+    def __init__(self, width: int, height: int, start: Optional[Tuple[int, int]] = None, goal: Optional[Tuple[int, int]] = None, self_generating=True, board=None, algorithm: str = "drunken_walk", seed: Optional[int] = None):
         self.width = width
         self.height = height
+        # a seed makes generation repeatable; otherwise the shared random module is used
+        self.random = random.Random(seed) if seed is not None else random
 
         if not board:
             self.board = [[MazeRoom() for _ in range(width)] for _ in range(height)]
         else:
             self.board = board
 
+        # Each location has exactly one MazeState (created on first use) and, once it has been
+        # expanded, a cached tuple of successor states, so searches do not allocate per expansion.
+        # The tables are allocated a row at a time, when a search first reaches that row, so a
+        # huge loaded maze opens without allocating anything per room.
+        self._states = [None] * height
+        self._successors = [None] * height
+        self._wall_masks = None  # a flat array of every room's wall mask, for get_successors_batch
+
         if start:
-            self.start_state = MazeState(self.board, start)
+            self.start_state = self.get_state(*start)
         else:
-            self.start_state = MazeState(self.board, (0, 0))
+            self.start_state = self.get_state(0, 0)
 
         if goal:
-            self.goal_state = MazeState(self.board, goal)
+            self.goal_state = self.get_state(*goal)
         else:
-            self.goal_state = MazeState(self.board, (height - 1, width - 1))
+            self.goal_state = self.get_state(height - 1, width - 1)
 
         if self_generating:
-            self.generate_board()
+            self.generate_board(algorithm)
 
-    def generate_board(self):
-        """Generates the maze by randomly carving out paths using the drunken walk algorithm."""
-        # Start generating the maze from a random start position
-        start_x, start_y = random.randint(0, self.width - 1), random.randint(0, self.height - 1)
-        self.drunken_walk(start_y, start_x)
+    def generate_board(self, algorithm: str = "drunken_walk"):
+        """
+        Generates the maze by randomly carving out paths. Every algorithm produces a
+        perfect maze: there is exactly one path between any two rooms.
+
+        Args:
+            algorithm (str): One of GENERATION_ALGORITHMS:
+                - 'drunken_walk': a randomized depth-first walk (recursive backtracker),
+                  giving long winding corridors.
+                - 'kruskal': randomized Kruskal's algorithm, giving many short dead ends.
+                - 'wilson': Wilson's loop-erased random walks, which pick uniformly among
+                  all possible perfect mazes.
+        """
+        if algorithm == "drunken_walk":
+            # Start generating the maze from a random start position
+            start_x, start_y = self.random.randint(0, self.width - 1), self.random.randint(0, self.height - 1)
+            self.drunken_walk(start_y, start_x)
+        elif algorithm == "kruskal":
+            self.kruskal()
+        elif algorithm == "wilson":
+            self.wilson()
+        else:
+            raise ValueError(f"Unknown maze generation algorithm {algorithm!r}, expected one of {GENERATION_ALGORITHMS}")
+        self.invalidate_successors()
     
     def drunken_walk(self, row: int, col: int):
         """
-        Recursively carves out a maze by randomly walking through the board, removing walls.
+        Carves out a maze by randomly walking through the board, removing walls, and backing
+        up to the last room with an unvisited neighbour whenever the walk gets stuck.
+
+        The walk keeps its own stack of rooms instead of recursing, so it works on boards of
+        any size.
 
         Args:
-            row (int): The current row in the board.
-            col (int): The current column in the board.
+            row (int): The row in the board to start from.
+            col (int): The column in the board to start from.
         """
-        directions = ['north', 'south', 'east', 'west']
-        random.shuffle(directions)  # Shuffle directions to ensure randomness
         self.board[row][col].visited = True  # Mark the current cell as visited
-
-        for direction in directions:
-            nx, ny = col, row
-            if direction == 'north':
-                ny -= 1
-            elif direction == 'south':
-                ny += 1
-            elif direction == 'east':
-                nx += 1
-            elif direction == 'west':
-                nx -= 1
+        # each entry is a room on the current walk and the directions it has left to try
+        stack = [(row, col, self._shuffled_directions())]
+        while stack:
+            row, col, directions = stack[-1]
+            if not directions:
+                stack.pop()
+                continue
+            direction = directions.pop()
+            d_row, d_col = DIRECTION_OFFSETS[direction]
+            ny, nx = row + d_row, col + d_col
 
             if not self.is_in_bounds(ny, nx):
                 setattr(self.board[row][col], direction, 1)  # Wall if out of bounds
-            else:
-                if not self.board[ny][nx].visited:
-                    setattr(self.board[row][col], direction, 0)
-                    setattr(self.board[ny][nx], self.opposite_direction(direction), 0)
-                    self.drunken_walk(ny, nx)
-    
+            elif not self.board[ny][nx].visited:
+                self._carve_wall(row, col, direction)
+                self.board[ny][nx].visited = True
+                stack.append((ny, nx, self._shuffled_directions()))
+
+    def kruskal(self):
+        """
+        Carves out a maze with randomized Kruskal's algorithm: walls between rooms are removed
+        in random order whenever the rooms on either side are not yet connected, using a
+        union-find forest over the rooms.
+        """
+        width = self.width
+        walls = [(row, col, 'south') for row in range(self.height - 1) for col in range(width)]
+        walls += [(row, col, 'east') for row in range(self.height) for col in range(width - 1)]
+        self.random.shuffle(walls)
+
+        parent = list(range(width * self.height))
+        size = [1] * (width * self.height)
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]  # path halving
+                cell = parent[cell]
+            return cell
+
+        joined = 1
+        for row, col, direction in walls:
+            cell = row * width + col
+            root = find(cell)
+            other_root = find(cell + width if direction == 'south' else cell + 1)
+            if root == other_root:
+                continue
+            if size[root] < size[other_root]:
+                root, other_root = other_root, root
+            parent[other_root] = root
+            size[root] += size[other_root]
+            self._carve_wall(row, col, direction)
+            joined += 1
+            if joined == width * self.height:
+                break
+        self._mark_all_visited()
+
+    def wilson(self):
+        """
+        Carves out a maze with Wilson's algorithm. Starting from a single room, each room that
+        is not yet part of the maze starts a random walk that runs until it reaches the maze.
+        Only the last direction taken out of each room is remembered, which erases any loops,
+        and the remaining path is carved into the maze.
+        """
+        width, height = self.width, self.height
+        directions = list(DIRECTION_OFFSETS)
+        in_maze = [False] * (width * height)
+        in_maze[self.random.randrange(width * height)] = True
+        exit_direction = {}
+        for first_cell in range(width * height):
+            if in_maze[first_cell]:
+                continue
+            row, col = divmod(first_cell, width)
+            # random walk until the maze is reached, overwriting the exit of revisited rooms
+            while not in_maze[row * width + col]:
+                direction = self.random.choice(directions)
+                d_row, d_col = DIRECTION_OFFSETS[direction]
+                if not self.is_in_bounds(row + d_row, col + d_col):
+                    continue
+                exit_direction[row * width + col] = direction
+                row, col = row + d_row, col + d_col
+            # carve the loop-erased walk into the maze
+            row, col = divmod(first_cell, width)
+            while not in_maze[row * width + col]:
+                in_maze[row * width + col] = True
+                direction = exit_direction[row * width + col]
+                self._carve_wall(row, col, direction)
+                d_row, d_col = DIRECTION_OFFSETS[direction]
+                row, col = row + d_row, col + d_col
+            exit_direction.clear()
+        self._mark_all_visited()
+
+    def remove_wall(self, row: int, col: int, direction: str):
+        """
+        Removes the wall on the given side of a room, and the matching wall of its neighbour,
+        and forgets the cached successors of both rooms so the next search sees the opening.
+
+        Args:
+            row (int): The row of the room.
+            col (int): The column of the room.
+            direction (str): The side of the room to open.
+        """
+        self.set_wall(row, col, direction, False)
+
+    def set_wall(self, row: int, col: int, direction: str, closed: bool):
+        """
+        Opens or closes the wall on the given side of a room. A wall belongs to the rooms on both
+        sides of it, so the neighbour's matching wall is set too, and the cached successors of
+        both rooms are forgotten (see invalidate_successors, which also calls mark_changed).
+
+        Args:
+            row (int): The row of the room.
+            col (int): The column of the room.
+            direction (str): The side of the room, e.g. 'east'.
+            closed (bool): True to build the wall, False to open it.
+
+        Raises:
+            ValueError: If asked to open a wall on the outer edge of the maze, or if the maze was
+                opened with load, whose board is read-only.
+        """
+        if getattr(self.board, "read_only", False):
+            raise ValueError("The board of a loaded maze is read-only")
+        d_row, d_col = DIRECTION_OFFSETS[direction]
+        neighbor_row, neighbor_col = row + d_row, col + d_col
+        if not self.is_in_bounds(neighbor_row, neighbor_col):
+            if not closed:
+                raise ValueError(f"The {direction} wall of room {(row, col)} is on the edge of the maze")
+            return  # the outer edge is always walled
+        setattr(self.board[row][col], direction, int(closed))
+        setattr(self.board[neighbor_row][neighbor_col], self.opposite_direction(direction), int(closed))
+        self.invalidate_successors([(row, col), (neighbor_row, neighbor_col)])
+
+    def _carve_wall(self, row: int, col: int, direction: str):
+        # remove_wall without touching the caches, for the generators, which clear them once
+        # when the whole board is done (see generate_board)
+        d_row, d_col = DIRECTION_OFFSETS[direction]
+        setattr(self.board[row][col], direction, 0)
+        setattr(self.board[row + d_row][col + d_col], self.opposite_direction(direction), 0)
+
+    def _shuffled_directions(self):
+        directions = ['north', 'south', 'east', 'west']
+        self.random.shuffle(directions)  # Shuffle directions to ensure randomness
+        return directions
+
+    def _mark_all_visited(self):
+        for board_row in self.board:
+            for room in board_row:
+                room.visited = True
+
+    def save(self, path: str):
+        """
+        Saves the maze (its walls, start and goal) to a compact binary file; see maze_file.py.
+        The file is written under a temporary name and then moved into place, so a loaded maze
+        can be saved over the file it was loaded from.
+
+        Args:
+            path (str): The file to write.
+        """
+        # imported here because maze_file builds on the classes in this module
+        from maze_file import write_rows
+        rows = ([room.to_mask() for room in board_row] for board_row in self.board)
+        write_rows(path, self.width, self.height, rows, self.start_state.location, self.goal_state.location)
+
+    @classmethod
+    def load(cls, path: str) -> "Maze":
+        """
+        Opens a maze saved with save (or streamed with maze_file.write_rows).
+
+        The file is memory-mapped rather than read, so even very large mazes open at once:
+        rooms are read from the file as the maze is searched. The board of the loaded maze is
+        read-only. Call close() to release the file, or use the maze as a context manager:
+
+            with Maze.load(path) as maze:
+                path, stats = bfs(maze)
+
+        Args:
+            path (str): The file to open.
+
+        Returns:
+            Maze: The maze stored in the file.
+        """
+        from maze_file import MappedBoard
+        board = MappedBoard(path)
+        return cls(board.width, board.height, board.start, board.goal, self_generating=False, board=board)
+
+    def close(self):
+        """Releases the file of a maze opened with load. Does nothing for other mazes."""
+        if hasattr(self.board, "close"):
+            self.board.close()
+
+    def __enter__(self) -> "Maze":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def is_in_bounds(self, row: int, col: int) -> bool:
         """
         Checks whether a given position is within the bounds of the maze.
@@ -152,6 +424,7 @@ class Maze(SearchProblem[MazeState]):
     def visualize_maze(self, path:Optional[Tuple[MazeState]] = None, algorithm_name:Optional[str] = None):
         """
         Visualizes the maze and optionally overlays a path explored by a search algorithm.
+        For large mazes, or machines without a display, use maze_render.render_maze instead.
 
         Args:
             path (Optional[Tuple[MazeState]]): The path to visualize within the maze.
@@ -164,17 +437,22 @@ class Maze(SearchProblem[MazeState]):
         else:
             ax.set_title("Maze Layout")
 
+        # All walls are drawn as a single collection; one plot call per wall is very slow on large mazes
+        segments = []
         for y in range(self.height):
             for x in range(self.width):
                 room = self.board[y][x]
                 if room.north == 1:
-                    ax.plot([x, x+1], [y, y], color='black')
+                    segments.append(((x, y), (x+1, y)))
                 if room.south == 1:
-                    ax.plot([x, x+1], [y+1, y+1], color='black')
+                    segments.append(((x, y+1), (x+1, y+1)))
                 if room.east == 1:
-                    ax.plot([x+1, x+1], [y, y+1], color='black')
+                    segments.append(((x+1, y), (x+1, y+1)))
                 if room.west == 1:
-                    ax.plot([x, x], [y, y+1], color='black')
+                    segments.append(((x, y), (x, y+1)))
+        ax.add_collection(LineCollection(segments, colors='black'))
+        ax.set_xlim(0, self.width)
+        ax.set_ylim(0, self.height)
 
         if path:
             path_x = [p.location[1] + 0.5 for p in path]  # Center the path marker in the cell
@@ -210,39 +488,271 @@ class Maze(SearchProblem[MazeState]):
         """
         return state == self.goal_state
     
-    def get_successors(self, state: MazeState) -> set[MazeState]:
+    def get_successors(self, state: MazeState) -> Tuple[MazeState, ...]:
         """
         Generates the successor states from the current state in the maze.
 
         This method checks all possible directions (north, south, east, west) from the current 
-        position in the maze and adds valid moves to the set of successors. A move is considered 
+        position in the maze and adds valid moves to the successors. A move is considered 
         valid if there is no wall blocking the path in that direction.
 
+        The successors of each location are worked out once and cached; call
+        invalidate_successors after editing the walls of a board that has been searched.
+
         Args:
             state (MazeState): The current state of the maze.
 
         Returns:
-            set[MazeState]: A set containing each valid successor state.
+            Tuple[MazeState, ...]: A tuple containing each valid successor state.
         """
-        successors = set()
-        row, col = state.location[0], state.location[1]
-        board = state.board  # Access the board from the state
+        row, col = state.location
+        if state.board is not self.board:
+            # a state from some other board (e.g. one built by MazeGenerator) is never cached
+            return self._find_successors(state.board, row, col, lambda r, c: MazeState(state.board, (r, c)))
+        row_successors = self._successors[row]
+        if row_successors is None:
+            row_successors = self._successors[row] = [None] * self.width
+        successors = row_successors[col]
+        if successors is None:
+            successors = self._find_successors(self.board, row, col, self.get_state)
+            row_successors[col] = successors
+        return successors
+
+    def _find_successors(self, board, row: int, col: int, make_state) -> Tuple[MazeState, ...]:
+        """Builds the successors of (row, col) on board, creating each state with make_state(row, col)."""
+        room = board[row][col]
+        successors = []
 
         # Check all possible directions and add valid moves to successors
-        if board[row][col].north == 0:  # Move North
-            next_state = MazeState(board, (row - 1, col))
-            successors.add(next_state)
+        if room.north == 0:  # Move North
+            successors.append(make_state(row - 1, col))
+
+        if room.south == 0:  # Move South
+            successors.append(make_state(row + 1, col))
+
+        if room.east == 0:  # Move East
+            successors.append(make_state(row, col + 1))
 
-        if board[row][col].south == 0:  # Move South
-            next_state = MazeState(board, (row + 1, col))
-            successors.add(next_state)
+        if room.west == 0:  # Move West
+            successors.append(make_state(row, col - 1))
 
-        if board[row][col].east == 0:  # Move East
-            next_state = MazeState(board, (row, col + 1))
-            successors.add(next_state)
+        return tuple(successors)
+
+    def get_state(self, row: int, col: int) -> MazeState:
+        """
+        Returns the MazeState for a location on this maze's board. Every call with the same
+        location returns the same object.
 
-        if board[row][col].west == 0:  # Move West
-            next_state = MazeState(board, (row, col - 1))
-            successors.add(next_state)
+        Args:
+            row (int): The row of the location.
+            col (int): The column of the location.
+
+        Returns:
+            MazeState: The shared state for (row, col).
+        """
+        row_states = self._states[row]
+        if row_states is None:
+            row_states = self._states[row] = [None] * self.width
+        state = row_states[col]
+        if state is None:
+            state = MazeState(self.board, (row, col))
+            row_states[col] = state
+        return state
+
+    def invalidate_successors(self, locations: Optional[Iterable[Tuple[int, int]]] = None):
+        """
+        Forgets cached successors so that edits to the board's walls are seen by the next search,
+        and marks the maze as changed (see SearchProblem.mark_changed).
+
+        Args:
+            locations (Optional[Iterable[Tuple[int, int]]]): The (row, col) of every room whose
+                walls changed (remember that a wall belongs to the rooms on both sides of it).
+                If None, the whole cache is cleared.
+        """
+        self.mark_changed()
+        self._wall_masks = None
+        if locations is None:
+            self._successors = [None] * self.height
+            return
+        for row, col in locations:
+            if self._successors[row] is not None:
+                self._successors[row][col] = None
+
+    def get_goal_states(self) -> Tuple[MazeState]:
+        """
+        Returns the goal states of the maze, for searches that grow backwards from the goal.
+
+        Returns:
+            Tuple[MazeState]: A tuple holding the single goal state.
+        """
+        return (self.goal_state,)
+
+    def get_predecessors(self, state: MazeState) -> Tuple[MazeState, ...]:
+        """
+        Generates the states that can move into the current state.
+
+        Walls are shared between neighbouring rooms, so every move can be reversed
+        and the predecessors are exactly the successors.
+
+        Args:
+            state (MazeState): The current state of the maze.
+
+        Returns:
+            Tuple[MazeState, ...]: A tuple containing each state that has a valid move into state.
+        """
+        return self.get_successors(state)
+
+    def num_states(self) -> int:
+        """
+        Returns the number of rooms. Rooms are numbered row by row: (row, col) is
+        row * width + col.
+        """
+        return self.width * self.height
+
+    def state_to_id(self, state: MazeState) -> int:
+        row, col = state.location
+        return row * self.width + col
+
+    def id_to_state(self, state_id: int) -> MazeState:
+        return self.get_state(*divmod(state_id, self.width))
+
+    def get_successors_batch(self, state_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generates every valid move out of many rooms at once, with array operations.
 
-        return successors
\ No newline at end of file
+        Args:
+            state_ids (np.ndarray): The numbers of the rooms to move from (see num_states).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The number of the room each move leaves from and the
+            number of the room it enters.
+        """
+        if self._wall_masks is None:
+            self._wall_masks = np.array([room.to_mask() for board_row in self.board for room in board_row], dtype=np.uint8)
+        masks = self._wall_masks[state_ids]
+        sources, targets = [], []
+        for bit, offset in ((NORTH, -self.width), (SOUTH, self.width), (EAST, 1), (WEST, -1)):
+            movable = state_ids[(masks & bit) == 0]
+            sources.append(movable)
+            targets.append(movable + offset)
+        return np.concatenate(sources), np.concatenate(targets)
+
+    def is_goal_batch(self, state_ids: np.ndarray) -> np.ndarray:
+        return state_ids == self.state_to_id(self.goal_state)
+
+    def encode_state(self, state: MazeState) -> bytes:
+        """
+        Packs a state's location into 8 bytes. They are big-endian, so the encodings sort in
+        the same order as the locations.
+        """
+        return LOCATION.pack(*state.location)
+
+    def decode_state(self, data: bytes) -> MazeState:
+        return self.get_state(*LOCATION.unpack(data))
+
+
+class WallMaskMaze(SearchProblem[MazeState]):
+    """
+    The SearchProblem methods of a maze whose rooms are read as 4-bit wall masks (see NORTH,
+    SOUTH, EAST and WEST) rather than MazeRoom objects, shared by ArrayMaze and MappedMaze.
+    A subclass sets start_state and goal_state and implements wall_mask; states are
+    MazeState objects made on demand, with nothing cached.
+    """
+    def wall_mask(self, row: int, col: int) -> int:
+        """Produces the wall mask of the room at (row, col)."""
+        raise NotImplementedError
+
+    def get_start_state(self) -> MazeState:
+        return self.start_state
+
+    def is_goal_state(self, state: MazeState) -> bool:
+        return state == self.goal_state
+
+    def get_successors(self, state: MazeState) -> List[MazeState]:
+        row, col = state.location
+        mask = self.wall_mask(row, col)
+        successors = []
+        if not mask & NORTH:
+            successors.append(MazeState(self, (row - 1, col)))
+        if not mask & SOUTH:
+            successors.append(MazeState(self, (row + 1, col)))
+        if not mask & EAST:
+            successors.append(MazeState(self, (row, col + 1)))
+        if not mask & WEST:
+            successors.append(MazeState(self, (row, col - 1)))
+        return successors
+
+    def get_goal_states(self) -> Tuple[MazeState]:
+        return (self.goal_state,)
+
+    def get_predecessors(self, state: MazeState) -> List[MazeState]:
+        return self.get_successors(state)
+
+    def encode_state(self, state: MazeState) -> bytes:
+        return LOCATION.pack(*state.location)
+
+    def decode_state(self, data: bytes) -> MazeState:
+        return MazeState(self, LOCATION.unpack(data))
+
+
+def eller_rows(width: int, height: int, seed: Optional[int] = None) -> Iterator[bytearray]:
+    """
+    Generates a perfect maze one row at a time with Eller's algorithm.
+
+    Only the current row is kept in memory: every room in it belongs to a set of rooms that
+    are already connected (through this row or the rows above). Neighbouring rooms from
+    different sets are joined at random, then every set opens at least one wall downwards so
+    that it stays connected to the rest of the maze. The last row joins all remaining sets.
+
+    Args:
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        seed (Optional[int]): Seed for a repeatable maze; otherwise the shared random module is used.
+
+    Yields:
+        bytearray: The wall masks of each row, from north to south (see NORTH, SOUTH, EAST and WEST).
+    """
+    rng = random.Random(seed) if seed is not None else random
+    next_set = 0
+    cell_sets = [None] * width  # the set of each room in the current row
+    north_open = [False] * width  # rooms whose north wall was opened by the row above
+    for row in range(height):
+        last_row = row == height - 1
+        walls = bytearray([ALL_WALLS] * width)
+        members = {}
+        for col in range(width):
+            if north_open[col]:
+                walls[col] &= ~NORTH
+            else:
+                cell_sets[col] = next_set
+                next_set += 1
+            members.setdefault(cell_sets[col], []).append(col)
+
+        # join neighbouring rooms from different sets, always on the last row
+        for col in range(width - 1):
+            left, right = cell_sets[col], cell_sets[col + 1]
+            if left == right or not (last_row or rng.random() < 0.5):
+                continue
+            walls[col] &= ~EAST
+            walls[col + 1] &= ~WEST
+            # relabel the smaller set so merging costs O(width log width) per row
+            if len(members[left]) < len(members[right]):
+                left, right = right, left
+            moved = members.pop(right)
+            for member in moved:
+                cell_sets[member] = left
+            members[left].extend(moved)
+        if last_row:
+            yield walls
+            return
+
+        # every set opens at least one wall to the row below
+        north_open = [False] * width
+        for cols in members.values():
+            opened = [col for col in cols if rng.random() < 0.5]
+            if not opened:
+                opened = [rng.choice(cols)]
+            for col in opened:
+                walls[col] &= ~SOUTH
+                north_open[col] = True
+        yield walls
@@ -0,0 +1,151 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from maze import Maze, MazeRoom, MazeState, WallMaskMaze, NORTH, SOUTH, EAST, WEST
+
+
+class ArrayMaze(WallMaskMaze):
+    """
+    An array-backed maze. Every room is stored as a 4-bit wall mask in a uint8 grid
+    (see NORTH, SOUTH, EAST and WEST in maze.py) instead of a MazeRoom object.
+
+    ArrayMaze implements the same SearchProblem interface as Maze, so bfs and dfs work on it
+    unchanged, and layered_bfs can solve it a whole frontier layer at a time.
+
+    Attributes:
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        walls (np.ndarray): A (height, width) uint8 array of wall masks.
+        start_state (MazeState): The starting state of the maze.
+        goal_state (MazeState): The goal state of the maze.
+    """
+    def __init__(self, walls: np.ndarray, start: Optional[Tuple[int, int]] = None, goal: Optional[Tuple[int, int]] = None):
+        self.walls = np.array(walls, dtype=np.uint8)
+        self.height, self.width = self.walls.shape
+        # The outer edge is always a wall, so moving through it can never leave the grid
+        self.walls[0, :] |= NORTH
+        self.walls[-1, :] |= SOUTH
+        self.walls[:, -1] |= EAST
+        self.walls[:, 0] |= WEST
+        self.start_state = MazeState(self, start if start else (0, 0))
+        self.goal_state = MazeState(self, goal if goal else (self.height - 1, self.width - 1))
+
+    @classmethod
+    def from_maze(cls, maze: Maze) -> "ArrayMaze":
+        """
+        Packs the board of a Maze into an ArrayMaze with the same start and goal.
+
+        Args:
+            maze (Maze): The maze to convert.
+
+        Returns:
+            ArrayMaze: The array-backed copy of maze.
+        """
+        walls = np.array([[room.to_mask() for room in row] for row in maze.board], dtype=np.uint8)
+        return cls(walls, maze.start_state.location, maze.goal_state.location)
+
+    def to_maze(self) -> Maze:
+        """
+        Unpacks the wall masks into a Maze of MazeRoom objects with the same start and goal,
+        e.g. to call visualize_maze.
+
+        Returns:
+            Maze: The MazeRoom-backed copy of this maze.
+        """
+        board = [[MazeRoom.from_mask(int(mask)) for mask in row] for row in self.walls]
+        return Maze(self.width, self.height, self.start_state.location, self.goal_state.location,
+                    self_generating=False, board=board)
+
+    def wall_mask(self, row: int, col: int) -> int:
+        return int(self.walls[row, col])
+
+
+def layered_bfs(walls: np.ndarray, start: Tuple[int, int], goal: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Runs a breadth-first search over a grid of wall masks, expanding one whole frontier
+    layer per iteration with array operations.
+
+    The grid is treated as flat, so moving in a direction is adding a fixed offset
+    (-width, +width, +1, -1) to the indices of the frontier cells whose wall bit in that
+    direction is clear. The frontier is kept as an index array rather than a full boolean
+    grid: perfect mazes have thousands of layers that are only a few cells wide, and
+    touching every cell on every layer would make the search quadratic.
+
+    Args:
+        walls (np.ndarray): A (height, width) array of wall masks whose outer edge is walled.
+        start (Tuple[int, int]): The (row, col) to search from.
+        goal (Optional[Tuple[int, int]]): Stop as soon as this (row, col) is reached.
+            If None, the whole reachable region is searched.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, int]:
+            - A (height, width) int32 distance field, -1 for cells that were not reached.
+            - A (height, width) uint8 array holding, for each reached cell, the direction
+              bit pointing back to the cell it was reached from (0 for the start).
+            - The number of cells expanded.
+    """
+    height, width = walls.shape
+    flat_walls = walls.ravel()
+    distance = np.full(height * width, -1, dtype=np.int32)
+    came_from = np.zeros(height * width, dtype=np.uint8)
+    # (wall bit blocking the move, flat offset of the move, direction bit pointing back)
+    moves = ((NORTH, -width, SOUTH), (SOUTH, width, NORTH), (EAST, 1, WEST), (WEST, -1, EAST))
+
+    frontier = np.array([start[0] * width + start[1]], dtype=np.int64)
+    goal_index = goal[0] * width + goal[1] if goal is not None else None
+    distance[frontier] = 0
+    depth = 0
+    expanded = 0
+    while frontier.size:
+        if goal_index is not None and distance[goal_index] != -1:
+            break
+        depth += 1
+        expanded += frontier.size
+        frontier_walls = flat_walls[frontier]
+        layer = []
+        for wall_bit, offset, back_bit in moves:
+            reached = frontier[(frontier_walls & wall_bit) == 0] + offset
+            # drop cells already reached, including by an earlier direction in this layer
+            reached = reached[distance[reached] == -1]
+            distance[reached] = depth
+            came_from[reached] = back_bit
+            layer.append(reached)
+        frontier = np.concatenate(layer)
+    return distance.reshape(height, width), came_from.reshape(height, width), expanded
+
+
+def array_bfs(maze: ArrayMaze) -> Tuple[Optional[List[MazeState]], Dict[str, int]]:
+    """
+    Solves an ArrayMaze with layered_bfs.
+
+    Unlike the searches in search.py, array_bfs takes no hooks and has no _steps form to run
+    under a run_search budget: it reads maze.walls directly rather than calling the problem's
+    methods, which are what collectors like TimingCollector wrap, and it has no per-state
+    frontier to report on. For hooks or budgets, search the ArrayMaze with bfs or bfs_steps.
+
+    Args:
+        maze (ArrayMaze): The maze to solve.
+
+    Returns:
+        Tuple[Optional[List[MazeState]], Dict[str, int]]:
+            - A list of states representing the shortest path, or None if no solution was found.
+            - A dictionary of search statistics, including:
+                a. 'path_length': The length of the final path.
+                b. 'states_expanded': The number of states expanded during the search.
+    """
+    goal = maze.goal_state.location
+    distance, came_from, expanded = layered_bfs(maze.walls, maze.start_state.location, goal)
+    stats = {"path_length": 0, "states_expanded": expanded}
+    if distance[goal] == -1:
+        return None, stats
+    steps = {NORTH: (-1, 0), SOUTH: (1, 0), EAST: (0, 1), WEST: (0, -1)}
+    row, col = goal
+    reverse_path = [MazeState(maze, goal)]
+    for _ in range(int(distance[goal])):
+        d_row, d_col = steps[int(came_from[row, col])]
+        row, col = row + d_row, col + d_col
+        reverse_path.append(MazeState(maze, (row, col)))
+    reverse_path.reverse()
+    stats["path_length"] = len(reverse_path)
+    return reverse_path, stats
@@ -0,0 +1,128 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from maze import MazeState
+from search import ucs
+from search_problem import SearchProblem
+
+
+class ContractedMaze(SearchProblem[MazeState]):
+    """
+    A maze contracted to the rooms where something happens: junctions (three or more exits),
+    the start and the goal. Each corridor of two-exit rooms between two of these becomes a
+    single edge weighted by its number of steps. Corridors ending in a dead end are dropped,
+    since no path through the maze can use them.
+
+    ContractedMaze implements the SearchProblem interface with get_successors returning a
+    {successor: cost} dictionary, like DirectedGraph, so ucs and astar find the shortest path
+    in steps. (bfs and dfs also work but only minimise the number of corridors.) Use expand_path
+    to turn a path of junctions back into the full path through every room.
+
+    Only the part of the maze reachable from the start is contracted.
+
+    Attributes:
+        maze (SearchProblem[MazeState]): The maze that was contracted.
+        edges (Dict[MazeState, Dict[MazeState, int]]): The corridor lengths between junctions.
+        maze_states (int): The number of rooms reachable from the start.
+    """
+    def __init__(self, maze: SearchProblem[MazeState]):
+        self.maze = maze
+        self.start_state = maze.get_start_state()
+        self.edges = {}
+        # the rooms strictly inside the corridor from one junction to the next, in order
+        self._corridors = {}
+        self.maze_states = 0
+        self._contract()
+
+    def _is_junction(self, state: MazeState, successors) -> bool:
+        return len(successors) != 2 or state == self.start_state or self.maze.is_goal_state(state)
+
+    def _contract(self):
+        maze = self.maze
+        to_visit = [self.start_state]
+        self.edges[self.start_state] = {}
+        # every corridor is walked once from each end, so this counts each corridor room twice
+        corridor_rooms = 0
+        dead_end_rooms = 0
+        while to_visit:
+            junction = to_visit.pop()
+            for first_step in maze.get_successors(junction):
+                previous, current = junction, first_step
+                corridor = []
+                successors = tuple(maze.get_successors(current))
+                while not self._is_junction(current, successors):
+                    corridor.append(current)
+                    previous, current = current, successors[0] if successors[1] == previous else successors[1]
+                    successors = tuple(maze.get_successors(current))
+                if len(successors) == 1 and current != self.start_state and not maze.is_goal_state(current):
+                    dead_end_rooms += len(corridor) + 1  # only ever walked from its open end
+                    continue
+                corridor_rooms += len(corridor)
+                if current == junction:
+                    continue  # a loop back to the same junction never shortens a path
+                if current not in self.edges:
+                    self.edges[current] = {}
+                    to_visit.append(current)
+                length = len(corridor) + 1
+                if current not in self.edges[junction] or length < self.edges[junction][current]:
+                    self.edges[junction][current] = length
+                    self._corridors[(junction, current)] = corridor
+        self.maze_states = len(self.edges) + corridor_rooms // 2 + dead_end_rooms
+
+    def get_start_state(self) -> MazeState:
+        return self.start_state
+
+    def is_goal_state(self, state: MazeState) -> bool:
+        return self.maze.is_goal_state(state)
+
+    def get_successors(self, state: MazeState) -> Dict[MazeState, int]:
+        return self.edges[state]
+
+    def expand_path(self, path: List[MazeState]) -> List[MazeState]:
+        """
+        Expands a path of junctions, as found by searching this problem, into the path through
+        every room of the original maze.
+
+        Args:
+            path (List[MazeState]): Consecutive junctions, each one corridor from the last.
+
+        Returns:
+            List[MazeState]: The same route with every corridor room filled in.
+        """
+        full_path = [path[0]]
+        for junction, next_junction in zip(path, path[1:]):
+            full_path.extend(self._corridors[(junction, next_junction)])
+            full_path.append(next_junction)
+        return full_path
+
+
+def solve_contracted(maze: SearchProblem[MazeState], algorithm: Callable = ucs) -> Tuple[Optional[List[MazeState]], Dict[str, float]]:
+    """
+    Contracts a maze, solves the contracted maze and expands the result.
+
+    Args:
+        maze (SearchProblem[MazeState]): The maze to solve.
+        algorithm (Callable): The search function to run on the contracted maze.
+
+    Returns:
+        Tuple[Optional[List[MazeState]], Dict[str, float]]:
+            - The full path through the maze, or None if no solution was found.
+            - The statistics from algorithm, with 'path_length' measured on the full path, plus:
+                a. 'maze_states': The number of rooms reachable from the start.
+                b. 'contracted_states': The number of junctions they were contracted to.
+                c. 'contraction_seconds': The time spent contracting.
+                d. 'search_seconds': The time spent searching the contracted maze.
+    """
+    started = time.perf_counter()
+    contracted = ContractedMaze(maze)
+    contracted_at = time.perf_counter()
+    path, stats = algorithm(contracted)
+    searched_at = time.perf_counter()
+    if path is not None:
+        path = contracted.expand_path(path)
+        stats["path_length"] = len(path)
+    stats["maze_states"] = contracted.maze_states
+    stats["contracted_states"] = len(contracted.edges)
+    stats["contraction_seconds"] = contracted_at - started
+    stats["search_seconds"] = searched_at - contracted_at
+    return path, stats
@@ -0,0 +1,200 @@
+# A compact binary file format for mazes.
+#
+# The file starts with a fixed header (see HEADER) holding the magic bytes, the format
+# version, the width and height and the start and goal locations. The rest of the file is
+# the rows of the maze from north to south. Each row packs two rooms per byte: the wall mask
+# (see NORTH, SOUTH, EAST and WEST in maze.py) of an even column goes in the low nibble and
+# that of the next, odd column in the high nibble. A row therefore takes (width + 1) // 2
+# bytes, and a row can be written as soon as it has been generated.
+
+import mmap
+import os
+import struct
+import tempfile
+from typing import BinaryIO, Iterable, Optional, Tuple
+
+from maze import MazeRoom, MazeState, WallMaskMaze
+
+MAGIC = b"MAZE"
+VERSION = 1
+# magic, version, width, height, start row, start col, goal row, goal col
+HEADER = struct.Struct("<4sI6Q")
+
+
+def row_size(width: int) -> int:
+    """The number of bytes used by one packed row of a maze of the given width."""
+    return (width + 1) // 2
+
+
+def pack_row(masks: Iterable[int], width: int) -> bytes:
+    """
+    Packs one row of wall masks, two rooms per byte.
+
+    Args:
+        masks (Iterable[int]): The wall mask of each room in the row, from west to east.
+        width (int): The number of rooms in the row.
+
+    Returns:
+        bytes: The packed row, row_size(width) bytes long.
+    """
+    packed = bytearray(row_size(width))
+    for col, mask in enumerate(masks):
+        packed[col >> 1] |= (mask & 0xF) << ((col & 1) * 4)
+    return bytes(packed)
+
+
+def write_header(file: BinaryIO, width: int, height: int, start: Optional[Tuple[int, int]] = None, goal: Optional[Tuple[int, int]] = None):
+    """
+    Writes the header of a maze file. The start and goal default to the north-west and
+    south-east corners, as they do for Maze.
+    """
+    start = start if start else (0, 0)
+    goal = goal if goal else (height - 1, width - 1)
+    file.write(HEADER.pack(MAGIC, VERSION, width, height, start[0], start[1], goal[0], goal[1]))
+
+
+def write_rows(path: str, width: int, height: int, rows: Iterable[Iterable[int]], start: Optional[Tuple[int, int]] = None, goal: Optional[Tuple[int, int]] = None) -> int:
+    """
+    Streams rows of wall masks (e.g. from eller_rows) into a maze file. Only one row is held in
+    memory at a time.
+
+    Args:
+        path (str): The file to write.
+        width (int): The width of the maze.
+        height (int): The number of rows that rows will produce.
+        rows (Iterable[Iterable[int]]): The wall masks of each row, from north to south.
+        start (Optional[Tuple[int, int]]): The start location stored in the header.
+        goal (Optional[Tuple[int, int]]): The goal location stored in the header.
+
+    Returns:
+        int: The number of rows written.
+    """
+    # write a temporary file next to path and move it into place at the end, so that a maze
+    # loaded from path (which reads the file through mmap) can be saved back over it safely
+    file = tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(os.path.abspath(path)),
+                                       prefix=os.path.basename(path) + ".", suffix=".tmp", delete=False)
+    try:
+        with file:
+            write_header(file, width, height, start, goal)
+            written = 0
+            for row in rows:
+                file.write(pack_row(row, width))
+                written += 1
+        if written != height:
+            raise ValueError(f"Expected {height} rows but got {written}")
+        os.replace(file.name, path)
+    except BaseException:
+        os.remove(file.name)
+        raise
+    return written
+
+
+def read_header(buffer) -> Tuple[int, int, Tuple[int, int], Tuple[int, int]]:
+    """
+    Reads the header at the start of a maze file's contents.
+
+    Returns:
+        Tuple[int, int, Tuple[int, int], Tuple[int, int]]: The width, height, start and goal.
+    """
+    magic, version, width, height, start_row, start_col, goal_row, goal_col = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a maze file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported maze file version {version}")
+    return width, height, (start_row, start_col), (goal_row, goal_col)
+
+
+class MappedBoard:
+    """
+    A read-only board backed by a memory-mapped maze file, used by Maze.load.
+
+    It can be indexed like a Maze board, board[row][col], but each access builds a fresh
+    MazeRoom from the wall nibble in the file, so changes to those rooms are not saved
+    (Maze.set_wall refuses to edit a read_only board).
+    """
+    read_only = True
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.width, self.height, self.start, self.goal = read_header(self._buffer)
+        self._row_size = row_size(self.width)
+        expected_size = HEADER.size + self.height * self._row_size
+        if len(self._buffer) < expected_size:
+            self._buffer.close()
+            raise ValueError(f"Maze file is truncated: expected {expected_size} bytes")
+
+    def wall_mask(self, row: int, col: int) -> int:
+        """Reads the wall mask of the room at (row, col) from the file."""
+        byte = self._buffer[HEADER.size + row * self._row_size + (col >> 1)]
+        return (byte >> ((col & 1) * 4)) & 0xF
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, row: int) -> "MappedRow":
+        if not 0 <= row < self.height:
+            raise IndexError(row)
+        return MappedRow(self, row)
+
+    def __iter__(self):
+        return (MappedRow(self, row) for row in range(self.height))
+
+    def close(self):
+        self._buffer.close()
+
+
+class MappedRow:
+    """One row of a MappedBoard."""
+    def __init__(self, board: MappedBoard, row: int):
+        self.board = board
+        self.row = row
+
+    def __len__(self) -> int:
+        return self.board.width
+
+    def __getitem__(self, col: int) -> MazeRoom:
+        if not 0 <= col < self.board.width:
+            raise IndexError(col)
+        return MazeRoom.from_mask(self.board.wall_mask(self.row, col))
+
+    def __iter__(self):
+        return (self[col] for col in range(self.board.width))
+
+
+class MappedMaze(WallMaskMaze):
+    """
+    A maze read straight from a maze file through mmap. Nothing is loaded up front: the
+    operating system pages in the rows that get_successors touches, so files much larger than
+    memory can be searched. Unlike a loaded Maze, MappedMaze caches nothing, so its memory use
+    does not grow with the part of the maze that has been searched.
+
+    Attributes:
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        start_state (MazeState): The starting state of the maze.
+        goal_state (MazeState): The goal state of the maze.
+    """
+    def __init__(self, path: str, start: Optional[Tuple[int, int]] = None, goal: Optional[Tuple[int, int]] = None):
+        """
+        path - the maze file to open
+
+        start, goal - override the start and goal locations stored in the file
+        """
+        self._board = MappedBoard(path)
+        self.width, self.height = self._board.width, self._board.height
+        self.start_state = MazeState(self, start if start else self._board.start)
+        self.goal_state = MazeState(self, goal if goal else self._board.goal)
+
+    def wall_mask(self, row: int, col: int) -> int:
+        """Reads the wall mask of the room at (row, col) from the file."""
+        return self._board.wall_mask(row, col)
+
+    def close(self):
+        self._board.close()
+
+    def __enter__(self) -> "MappedMaze":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -112,6 +112,7 @@ class MazeGenerator(SearchProblem[MazeState]):
                         setattr(self.board[new_row][new_col], self.opposite_direction(direction), 0)
                         self.board[new_row][new_col].visited = True
                         self.visited_cells_count += 1
+                        self.mark_changed()
                         new_maze_state = MazeState(state.board, (new_row, new_col))
                         successors.add(new_maze_state)
             return successors
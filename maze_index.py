@@ -0,0 +1,185 @@
+# Path queries on perfect mazes.
+#
+# A perfect maze (every maze the generators in maze.py make) is a spanning tree of its rooms:
+# there is exactly one path between any two rooms. Rooting the tree once, anywhere, turns every
+# path query into two climbs towards the root that meet at the lowest common ancestor (LCA) of
+# the two rooms, which binary lifting finds in O(log n) steps.
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from search_problem import SearchProblem, State
+
+
+class MazePathIndex:
+    """
+    Answers distance and path queries between any two states of a perfect maze without
+    searching: distance in O(log n) and path in O(log n + path length), after an O(n log n)
+    build.
+
+    Any SearchProblem whose moves can be undone (get_successors is symmetric) and whose states
+    form a tree can be indexed. Problems that number their states (see num_states) are indexed
+    with get_successors_batch, a layer at a time; others with get_successors, one state at a time,
+    in which case only the states reachable from the root are indexed.
+
+    Attributes:
+        problem (SearchProblem[State]): The indexed maze.
+        root (State): The state the tree is rooted at.
+        depth (np.ndarray): The number of moves from the root to each state, by state number.
+        parent (np.ndarray): The number of each state's parent; the root is its own parent.
+    """
+    def __init__(self, problem: SearchProblem[State], root: Optional[State] = None):
+        """
+        problem - the maze to index; ValueError is raised if it is not perfect
+
+        root - the state to root the tree at; the start state by default
+        """
+        self.problem = problem
+        self.root = problem.get_start_state() if root is None else root
+        if problem.num_states() is not None:
+            self._to_id, self._from_id = problem.state_to_id, problem.id_to_state
+            self.parent, self.depth = self._build_batch(problem.num_states())
+        else:
+            self.parent, self.depth = self._build()
+        # up[k][i] is the ancestor 2**k levels above state i (or the root, if that is closer)
+        self.up = [self.parent]
+        for _ in range(max(1, int(self.depth.max()).bit_length()) - 1):
+            self.up.append(self.up[-1][self.up[-1]])
+
+    def _build_batch(self, num_states: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Roots the tree with a layer-at-a-time BFS over the problem's state numbers."""
+        root_id = self._to_id(self.root)
+        parent = np.full(num_states, -1, dtype=np.int64)
+        depth = np.full(num_states, -1, dtype=np.int64)
+        parent[root_id] = root_id
+        depth[root_id] = 0
+        frontier = np.array([root_id], dtype=np.int64)
+        layer = 0
+        while frontier.size:
+            layer += 1
+            sources, targets = self.problem.get_successors_batch(frontier)
+            # in a tree, the only neighbour already reached is the one a state was reached from
+            forward = targets != parent[sources]
+            sources, targets = sources[forward], targets[forward]
+            if (depth[targets] != -1).any() or np.unique(targets).size != targets.size:
+                raise ValueError("The maze is not perfect: it has a loop")
+            parent[targets] = sources
+            depth[targets] = layer
+            frontier = targets
+        if (depth == -1).any():
+            raise ValueError("The maze is not perfect: some states cannot be reached from the root")
+        return parent, depth
+
+    def _build(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Roots the tree with a BFS over get_successors, numbering states as they are reached."""
+        states = [self.root]
+        ids = {self.root: 0}
+        parents = [0]
+        depths = [0]
+        for state_id, state in enumerate(states):  # states grows as the search goes
+            parent_state = states[parents[state_id]]
+            for successor in self.problem.get_successors(state):
+                if state_id and successor == parent_state:
+                    continue
+                if successor in ids:
+                    raise ValueError("The maze is not perfect: it has a loop")
+                ids[successor] = len(states)
+                states.append(successor)
+                parents.append(state_id)
+                depths.append(depths[state_id] + 1)
+        self._to_id, self._from_id = ids.__getitem__, states.__getitem__
+        return np.array(parents, dtype=np.int64), np.array(depths, dtype=np.int64)
+
+    def _lca_id(self, a: int, b: int) -> int:
+        depth, up = self.depth, self.up
+        if depth[a] < depth[b]:
+            a, b = b, a
+        difference = int(depth[a] - depth[b])
+        level = 0
+        while difference:
+            if difference & 1:
+                a = int(up[level][a])
+            difference >>= 1
+            level += 1
+        if a == b:
+            return a
+        for level in range(len(up) - 1, -1, -1):
+            if up[level][a] != up[level][b]:
+                a, b = int(up[level][a]), int(up[level][b])
+        return int(self.parent[a])
+
+    def lca(self, a: State, b: State) -> State:
+        """
+        Finds the state where the paths from a and from b to the root meet; the unique path
+        from a to b passes through it.
+        """
+        return self._from_id(self._lca_id(self._to_id(a), self._to_id(b)))
+
+    def distance(self, start: State, goal: State) -> int:
+        """
+        Counts the moves on the path from start to goal (one less than the path length bfs
+        reports).
+
+        Args:
+            start (State): Where the path starts.
+            goal (State): Where the path ends.
+
+        Returns:
+            int: The number of moves between start and goal.
+        """
+        a, b = self._to_id(start), self._to_id(goal)
+        return int(self.depth[a] + self.depth[b] - 2 * self.depth[self._lca_id(a, b)])
+
+    def distances(self, starts: np.ndarray, goals: np.ndarray) -> np.ndarray:
+        """
+        Counts the moves between many pairs of states at once, with array operations.
+
+        Args:
+            starts (np.ndarray): State numbers (see state_to_id) where the paths start.
+            goals (np.ndarray): State numbers where the paths end, as long as starts.
+
+        Returns:
+            np.ndarray: The number of moves between each pair.
+        """
+        depth, up = self.depth, self.up
+        starts, goals = np.asarray(starts, dtype=np.int64), np.asarray(goals, dtype=np.int64)
+        a, b = starts, goals
+        swap = depth[a] < depth[b]
+        a, b = np.where(swap, b, a), np.where(swap, a, b)
+        difference = depth[a] - depth[b]
+        for level in range(len(up)):
+            a = np.where((difference >> level) & 1, up[level][a], a)
+        for level in range(len(up) - 1, -1, -1):
+            differ = up[level][a] != up[level][b]
+            a, b = np.where(differ, up[level][a], a), np.where(differ, up[level][b], b)
+        lca = np.where(a == b, a, self.parent[a])
+        return depth[starts] + depth[goals] - 2 * depth[lca]
+
+    def path(self, start: State, goal: State) -> List[State]:
+        """
+        Produces the path from start to goal, the same one bfs would find.
+
+        Args:
+            start (State): Where the path starts.
+            goal (State): Where the path ends.
+
+        Returns:
+            List[State]: The states on the path, including start and goal.
+        """
+        a, b = self._to_id(start), self._to_id(goal)
+        meeting = self._lca_id(a, b)
+        parent = self.parent
+        up_path = [a]
+        while up_path[-1] != meeting:
+            up_path.append(int(parent[up_path[-1]]))
+        down_path = []
+        while b != meeting:
+            down_path.append(b)
+            b = int(parent[b])
+        down_path.reverse()
+        return [self._from_id(state_id) for state_id in up_path + down_path]
+
+    def state_to_id(self, state: State) -> int:
+        """Produces the number the index uses for a state, e.g. for distances."""
+        return self._to_id(state)
@@ -0,0 +1,95 @@
+# Fast, headless rendering of mazes to image files.
+#
+# Instead of drawing every wall as a separate matplotlib line (as Maze.visualize_maze does),
+# the maze is rasterized straight into an image array: room (row, col) becomes pixel
+# (2 * row + 1, 2 * col + 1) and the pixels between rooms are the walls. The image is written
+# with matplotlib.image.imsave, which never opens a window.
+
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import matplotlib
+import matplotlib.image
+
+from maze import Maze, MazeState, NORTH, SOUTH, EAST, WEST
+from maze_array import ArrayMaze
+
+WALL_COLOR = (0, 0, 0)
+FLOOR_COLOR = (255, 255, 255)
+PATH_COLOR = (220, 30, 30)
+
+
+def wall_image(walls: np.ndarray) -> np.ndarray:
+    """
+    Rasterizes a grid of wall masks.
+
+    Args:
+        walls (np.ndarray): A (height, width) array of wall masks.
+
+    Returns:
+        np.ndarray: A (2 * height + 1, 2 * width + 1) boolean image that is True on walls.
+    """
+    height, width = walls.shape
+    image = np.zeros((2 * height + 1, 2 * width + 1), dtype=bool)
+    image[::2, ::2] = True  # the corners between rooms are always solid
+    image[0:-1:2, 1::2] |= (walls & NORTH) != 0
+    image[2::2, 1::2] |= (walls & SOUTH) != 0
+    image[1::2, 0:-1:2] |= (walls & WEST) != 0
+    image[1::2, 2::2] |= (walls & EAST) != 0
+    return image
+
+
+def render_maze(maze: Union[Maze, ArrayMaze], filename: str, path: Optional[Iterable[MazeState]] = None,
+                expanded: Optional[Union[np.ndarray, Iterable]] = None, scale: int = 2,
+                colormap: str = "YlGnBu"):
+    """
+    Renders a maze to an image file (PNG unless filename says otherwise) without a display.
+
+    Args:
+        maze (Union[Maze, ArrayMaze]): The maze to draw.
+        filename (str): The image file to write.
+        path (Optional[Iterable[MazeState]]): A path to draw over the maze, e.g. from bfs.
+        expanded (Optional[Union[np.ndarray, Iterable]]): Rooms to shade as a heatmap. Either a
+            (height, width) array of values where negative or NaN entries are left unshaded (such as
+            the distance field from layered_bfs), or an iterable of states or (row, col) locations
+            that were expanded, which are shaded uniformly.
+        scale (int): The number of pixels per maze pixel; rooms and walls are each scale pixels wide.
+        colormap (str): The matplotlib colormap used for the heatmap.
+    """
+    walls = maze.walls if isinstance(maze, ArrayMaze) else ArrayMaze.from_maze(maze).walls
+    height, width = walls.shape
+    image = np.empty((2 * height + 1, 2 * width + 1, 3), dtype=np.uint8)
+    image[:] = FLOOR_COLOR
+
+    if expanded is not None:
+        heat = _heat_values(expanded, height, width)
+        shaded = np.isfinite(heat) & (heat >= 0)
+        if shaded.any():
+            low, high = heat[shaded].min(), heat[shaded].max()
+            normalized = (heat - low) / (high - low) if high > low else np.full(heat.shape, 0.5)
+            colors = matplotlib.colormaps[colormap](np.where(shaded, normalized, 0), bytes=True)[..., :3]
+            rooms = image[1::2, 1::2]
+            rooms[shaded] = colors[shaded]
+
+    if path:
+        locations = np.array([state.location if isinstance(state, MazeState) else state for state in path])
+        rows, cols = 2 * locations[:, 0] + 1, 2 * locations[:, 1] + 1
+        image[rows, cols] = PATH_COLOR
+        # also color the gap between consecutive rooms on the path
+        image[(rows[:-1] + rows[1:]) // 2, (cols[:-1] + cols[1:]) // 2] = PATH_COLOR
+
+    image[wall_image(walls)] = WALL_COLOR
+    if scale > 1:
+        image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+    matplotlib.image.imsave(filename, image)
+
+
+def _heat_values(expanded, height: int, width: int) -> np.ndarray:
+    """Turns the expanded argument of render_maze into a (height, width) float array."""
+    if isinstance(expanded, np.ndarray):
+        return expanded.astype(float)
+    heat = np.full((height, width), -1.0)
+    for item in expanded:
+        row, col = item.location if isinstance(item, MazeState) else item
+        heat[row, col] = 1.0
+    return heat
@@ -1,15 +1,26 @@
-from typing import List, Tuple, Dict
-from queue import Queue  
+import heapq
+import time
+import numpy as np
+from typing import Callable, Generator, Iterable, List, Optional, Tuple, Dict
+from collections import deque
+from itertools import count
 from search_problem import SearchProblem, State
-from maze import Maze
+from search_hooks import SearchHooks
+from maze import Maze, MazeState
 
 
-def bfs(problem: SearchProblem[State]) -> Tuple[List[State], Dict[str, int]]:
+def bfs(problem: SearchProblem[State], hooks: Optional[SearchHooks] = None) -> Tuple[Optional[List[State]], Dict[str, int]]:
     """
     Performs Breadth-First Search (BFS) on the given problem.
 
+    The frontier is a deque of states and each discovered state records its
+    predecessor, so membership checks are O(1) and no partial paths are copied.
+    bfs_steps runs the same search one step at a time.
+
     Args:
         problem (SearchProblem[State]): The search problem to solve.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
 
     Returns:
         Tuple[Optional[List[State]], Dict[str, int]]:
@@ -19,34 +30,83 @@ def bfs(problem: SearchProblem[State]) -> Tuple[List[State], Dict[str, int]]:
                 b. 'states_expanded': The number of states expanded during the search.
                 c. 'max_frontier_size': The maximum size of the frontier during the search.
     """
+    return finish_search(_bfs_steps(problem, report_every=None, hooks=hooks))
+
+
+
+def bfs_steps(problem: SearchProblem[State], report_every: int = 1, hooks: Optional[SearchHooks] = None) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """
+    Performs Breadth-First Search as a generator that can be paused and resumed
+    (see run_search for running it under a budget).
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        report_every (int): Yield the stats dictionary every report_every expansions; must
+            be at least 1, since run_search only checks its budgets when the search yields.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Yields:
+        Dict[str, int]: The live statistics dictionary of the search so far.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]: The result of bfs, as the value of
+        the StopIteration that ends the generator.
+    """
+    _check_report_every(report_every)
+    return _bfs_steps(problem, report_every, hooks)
+
+
+def _bfs_steps(problem: SearchProblem[State], report_every: Optional[int], hooks: Optional[SearchHooks]) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """The generator behind bfs_steps, which never yields when report_every is None."""
     stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0}
-    paths_queue = [[problem.get_start_state()]]
-    visited = [problem.get_start_state()]
-    while(len(paths_queue) > 0):
-        cur_path = paths_queue.pop(0)
-        if problem.is_goal_state(cur_path[-1]): #if the end of the current path is the goal
-            stats["path_length"] = len(cur_path)
-            #cur_path if the number of squares visted, so the path length is one less because it is the number of lines between points
-            return (cur_path, stats)
-        else:
-            successors = problem.get_successors(cur_path[-1])
-            for successor in successors:
-                if successor not in visited:
-                    new_path = cur_path + [successor]
-                    paths_queue.append(new_path)
-                    visited.append(successor)
-            stats["states_expanded"] = stats["states_expanded"] + 1
-            stats["max_frontier_size"] = max(stats["max_frontier_size"], len(paths_queue))
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    start = problem.get_start_state()
+    frontier = deque([start])
+    #parents maps every state that has been added to the frontier to the state it was reached from
+    parents = {start: None}
+    while frontier:
+        cur_state = frontier.popleft()
+        if problem.is_goal_state(cur_state):
+            path = reconstruct_path(parents, cur_state, problem)
+            stats["path_length"] = len(path)
+            if hooks is not None:
+                hooks.on_goal(cur_state)
+                hooks.on_finish(stats)
+            return (path, stats)
+        if hooks is not None:
+            hooks.on_expand(cur_state)
+        for successor in problem.get_successors(cur_state):
+            if hooks is not None:
+                hooks.on_generate(successor, cur_state)
+            if successor not in parents:
+                parents[successor] = cur_state
+                frontier.append(successor)
+            elif hooks is not None:
+                hooks.on_duplicate(successor, cur_state)
+        stats["states_expanded"] += 1
+        stats["max_frontier_size"] = max(stats["max_frontier_size"], len(frontier))
+        if report_every and stats["states_expanded"] % report_every == 0:
+            yield stats
+    if hooks is not None:
+        hooks.on_finish(stats)
     return None, stats
 
 
 
-def dfs(problem: SearchProblem[State]) -> tuple[List[State], Dict[str, int]]:
+def dfs(problem: SearchProblem[State], hooks: Optional[SearchHooks] = None) -> Tuple[Optional[List[State]], Dict[str, int]]:
     """
     Performs a depth-first search (DFS) on the given search problem.
 
+    The frontier is a stack of states and each discovered state records its
+    predecessor, so membership checks are O(1) and no partial paths are copied.
+    dfs_steps runs the same search one step at a time.
+
     Args:
         problem (SearchProblem[State]): The search problem to solve.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
 
     Returns:
         Tuple[Optional[List[State]], Dict[str, int]]:
@@ -56,35 +116,704 @@ def dfs(problem: SearchProblem[State]) -> tuple[List[State], Dict[str, int]]:
                 b. 'states_expanded': The number of states expanded during the search.
                 d. 'max_frontier_size': The maximum size of the frontier during the search.
     """
+    return finish_search(_dfs_steps(problem, report_every=None, hooks=hooks))
+
+
+
+def dfs_steps(problem: SearchProblem[State], report_every: int = 1, hooks: Optional[SearchHooks] = None) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """
+    Performs a depth-first search as a generator that can be paused and resumed
+    (see run_search for running it under a budget).
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        report_every (int): Yield the stats dictionary every report_every expansions; must
+            be at least 1, since run_search only checks its budgets when the search yields.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Yields:
+        Dict[str, int]: The live statistics dictionary of the search so far.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]: The result of dfs, as the value of
+        the StopIteration that ends the generator.
+    """
+    _check_report_every(report_every)
+    return _dfs_steps(problem, report_every, hooks)
+
+
+def _dfs_steps(problem: SearchProblem[State], report_every: Optional[int], hooks: Optional[SearchHooks]) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """The generator behind dfs_steps, which never yields when report_every is None."""
     stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0}
-    paths_queue = [[problem.get_start_state()]]
-     #visited stores all states that have been added to the paths_queue 
-     # (even if they have not yet been removed from paths_queue)
-    visited = [problem.get_start_state()]
-    while(len(paths_queue) > 0):
-        cur_path = paths_queue.pop(-1)
-        if problem.is_goal_state(cur_path[-1]): #if the end of the current path is the goal
-            stats["path_length"] = len(cur_path)
-            return (cur_path, stats)
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    start = problem.get_start_state()
+    frontier = [start]
+    #parents stores all states that have been added to the frontier
+    # (even if they have not yet been removed from the frontier)
+    parents = {start: None}
+    while frontier:
+        cur_state = frontier.pop()
+        if problem.is_goal_state(cur_state):
+            path = reconstruct_path(parents, cur_state, problem)
+            stats["path_length"] = len(path)
+            if hooks is not None:
+                hooks.on_goal(cur_state)
+                hooks.on_finish(stats)
+            return (path, stats)
+        if hooks is not None:
+            hooks.on_expand(cur_state)
+        successors = problem.get_successors(cur_state)
+        stats["states_expanded"] += 1
+        for successor in successors:
+            if hooks is not None:
+                hooks.on_generate(successor, cur_state)
+            if successor not in parents:
+                parents[successor] = cur_state
+                frontier.append(successor)
+            elif hooks is not None:
+                hooks.on_duplicate(successor, cur_state)
+        stats["max_frontier_size"] = max(stats["max_frontier_size"], len(frontier))
+        if report_every and stats["states_expanded"] % report_every == 0:
+            yield stats
+    if hooks is not None:
+        hooks.on_finish(stats)
+    return None, stats
+
+
+
+def ucs(problem: SearchProblem[State], hooks: Optional[SearchHooks] = None) -> Tuple[Optional[List[State]], Dict[str, float]]:
+    """
+    Performs Uniform-Cost Search (UCS) on the given problem.
+
+    Edge costs are taken from get_successors when it returns a {successor: cost}
+    dictionary (as DirectedGraph does); any other collection counts every step as 1.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, float]]:
+            - A list of states representing the cheapest solution path, or None if no solution was found.
+            - A dictionary of search statistics with the same keys as bfs plus
+              'path_cost': the total edge cost of the returned path.
+    """
+    return astar(problem, null_heuristic, hooks)
+
+
+
+def ucs_steps(problem: SearchProblem[State], report_every: int = 1, hooks: Optional[SearchHooks] = None) -> Generator[Dict[str, float], None, Tuple[Optional[List[State]], Dict[str, float]]]:
+    """Performs Uniform-Cost Search as a generator; see astar_steps."""
+    return astar_steps(problem, null_heuristic, report_every, hooks)
+
+
+
+def astar(problem: SearchProblem[State], heuristic: Callable[[State, SearchProblem[State]], float] = None, hooks: Optional[SearchHooks] = None) -> Tuple[Optional[List[State]], Dict[str, float]]:
+    """
+    Performs A* search on the given problem.
+
+    The frontier is a binary heap ordered by g + h. Instead of a decrease-key
+    operation, a cheaper route to a state pushes a new heap entry and the old one
+    is skipped when popped (lazy deletion). astar_steps runs the same search one step
+    at a time.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        heuristic (Callable[[State, SearchProblem[State]], float]): An admissible estimate
+            of the remaining cost from a state to the goal. Defaults to null_heuristic,
+            which makes this uniform-cost search.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, float]]:
+            - A list of states representing the cheapest solution path, or None if no solution was found.
+            - A dictionary of search statistics with the same keys as bfs plus
+              'path_cost': the total edge cost of the returned path.
+    """
+    return finish_search(_astar_steps(problem, heuristic, report_every=None, hooks=hooks))
+
+
+
+def astar_steps(problem: SearchProblem[State], heuristic: Callable[[State, SearchProblem[State]], float] = None, report_every: int = 1, hooks: Optional[SearchHooks] = None) -> Generator[Dict[str, float], None, Tuple[Optional[List[State]], Dict[str, float]]]:
+    """
+    Performs A* search as a generator that can be paused and resumed
+    (see run_search for running it under a budget).
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        heuristic (Callable[[State, SearchProblem[State]], float]): As for astar.
+        report_every (int): Yield the stats dictionary every report_every expansions; must
+            be at least 1, since run_search only checks its budgets when the search yields.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Yields:
+        Dict[str, float]: The live statistics dictionary of the search so far.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, float]]: The result of astar, as the value of
+        the StopIteration that ends the generator.
+    """
+    _check_report_every(report_every)
+    return _astar_steps(problem, heuristic, report_every, hooks)
+
+
+def _astar_steps(problem: SearchProblem[State], heuristic: Callable[[State, SearchProblem[State]], float], report_every: Optional[int], hooks: Optional[SearchHooks]) -> Generator[Dict[str, float], None, Tuple[Optional[List[State]], Dict[str, float]]]:
+    """The generator behind astar_steps, which never yields when report_every is None."""
+    if heuristic is None:
+        heuristic = null_heuristic
+    stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0, "path_cost": 0}
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    start = problem.get_start_state()
+    #ties on g + h go to the smaller h (the state closer to the goal); the counter breaks
+    # any remaining ties so states never need to be comparable
+    counter = count()
+    start_h = heuristic(start, problem)
+    frontier = [(start_h, start_h, next(counter), start)]
+    parents = {start: None}
+    costs = {start: 0}
+    expanded = set()
+    while frontier:
+        _, _, _, cur_state = heapq.heappop(frontier)
+        if cur_state in expanded:
+            continue #stale entry left behind by a cheaper route
+        if problem.is_goal_state(cur_state):
+            path = reconstruct_path(parents, cur_state, problem)
+            stats["path_length"] = len(path)
+            stats["path_cost"] = costs[cur_state]
+            if hooks is not None:
+                hooks.on_goal(cur_state)
+                hooks.on_finish(stats)
+            return (path, stats)
+        if hooks is not None:
+            hooks.on_expand(cur_state)
+        expanded.add(cur_state)
+        cur_cost = costs[cur_state]
+        for successor, step_cost in weighted_successors(problem, cur_state):
+            if hooks is not None:
+                hooks.on_generate(successor, cur_state)
+            new_cost = cur_cost + step_cost
+            if successor not in costs or new_cost < costs[successor]:
+                costs[successor] = new_cost
+                parents[successor] = cur_state
+                expanded.discard(successor)
+                successor_h = heuristic(successor, problem)
+                heapq.heappush(frontier, (new_cost + successor_h, successor_h, next(counter), successor))
+            elif hooks is not None:
+                hooks.on_duplicate(successor, cur_state)
+        stats["states_expanded"] += 1
+        stats["max_frontier_size"] = max(stats["max_frontier_size"], len(frontier))
+        if report_every and stats["states_expanded"] % report_every == 0:
+            yield stats
+    if hooks is not None:
+        hooks.on_finish(stats)
+    return None, stats
+
+
+
+def bidirectional_bfs(problem: SearchProblem[State], hooks: Optional[SearchHooks] = None) -> Tuple[Optional[List[State]], Dict[str, int]]:
+    """
+    Performs a breadth-first search that grows one frontier forwards from the start state
+    and another backwards from the goal states, stopping when the two meet.
+
+    The problem must implement get_goal_states and get_predecessors. Each round expands a
+    whole layer of the smaller frontier, so the returned path is a shortest path.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]:
+            - A list of states representing the solution path, or None if no solution was found.
+            - A dictionary of search statistics with the same keys as bfs plus
+              'forward_states_expanded' and 'backward_states_expanded': the expansions made
+              by each side ('states_expanded' is their sum).
+    """
+    return finish_search(_bidirectional_bfs_steps(problem, report_every=None, hooks=hooks))
+
+
+
+def bidirectional_bfs_steps(problem: SearchProblem[State], report_every: int = 1, hooks: Optional[SearchHooks] = None) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """
+    Performs a bidirectional breadth-first search as a generator that can be paused and
+    resumed (see run_search for running it under a budget). Whole layers are expanded
+    between yields, so it yields after the layer that takes 'states_expanded' past each
+    multiple of report_every.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        report_every (int): Yield the stats dictionary every report_every expansions; must
+            be at least 1, since run_search only checks its budgets when the search yields.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Yields:
+        Dict[str, int]: The live statistics dictionary of the search so far.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]: The result of bidirectional_bfs, as
+        the value of the StopIteration that ends the generator.
+    """
+    _check_report_every(report_every)
+    return _bidirectional_bfs_steps(problem, report_every, hooks)
+
+
+def _bidirectional_bfs_steps(problem: SearchProblem[State], report_every: Optional[int], hooks: Optional[SearchHooks]) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """The generator behind bidirectional_bfs_steps, which never yields when report_every is None."""
+    stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0,
+             "forward_states_expanded": 0, "backward_states_expanded": 0}
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    start = problem.get_start_state()
+    #forward_parents maps a state to its predecessor on the way from the start,
+    # backward_parents maps a state to the next state on its way to a goal
+    forward_parents = {start: None}
+    forward_depths = {start: 0}
+    backward_parents = {}
+    backward_depths = {}
+    for goal in problem.get_goal_states():
+        backward_parents[goal] = None
+        backward_depths[goal] = 0
+    forward_frontier = [start]
+    backward_frontier = list(backward_parents)
+    meeting_state = start if start in backward_parents else None
+    while meeting_state is None and forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            stats["forward_states_expanded"] += len(forward_frontier)
+            forward_frontier, meeting_state = _expand_layer(
+                forward_frontier, forward_parents, forward_depths, backward_depths, problem.get_successors, hooks)
         else:
-            successors = problem.get_successors(cur_path[-1])
-            stats["states_expanded"] = stats["states_expanded"] + 1
-            for successor in successors:
-                if successor not in visited:
-                    new_path = cur_path + [successor]
-                    paths_queue.append(new_path)
-                    visited.append(successor)
-            stats["max_frontier_size"] = max(stats["max_frontier_size"], len(paths_queue))
-    return None
+            stats["backward_states_expanded"] += len(backward_frontier)
+            backward_frontier, meeting_state = _expand_layer(
+                backward_frontier, backward_parents, backward_depths, forward_depths, problem.get_predecessors, hooks)
+        stats["max_frontier_size"] = max(stats["max_frontier_size"], len(forward_frontier) + len(backward_frontier))
+        reported = stats["states_expanded"]
+        stats["states_expanded"] = stats["forward_states_expanded"] + stats["backward_states_expanded"]
+        if report_every and stats["states_expanded"] // report_every > reported // report_every:
+            yield stats
+    if meeting_state is None:
+        if hooks is not None:
+            hooks.on_finish(stats)
+        return None, stats
+    path = reconstruct_path(forward_parents, meeting_state, problem)
+    next_state = backward_parents[meeting_state]
+    while next_state is not None:
+        path.append(next_state)
+        next_state = backward_parents[next_state]
+    stats["path_length"] = len(path)
+    if hooks is not None:
+        hooks.on_goal(path[-1])
+        hooks.on_finish(stats)
+    return (path, stats)
+
 
+def _expand_layer(layer, parents, depths, other_depths, get_neighbors, hooks=None):
+    """
+    Expands every state in one BFS layer for bidirectional_bfs.
+
+    Returns the next layer and the state where this side met the other side with the
+    fewest total steps, or None if the sides did not meet.
+    """
+    next_layer = []
+    meeting_state = None
+    best_length = None
+    for cur_state in layer:
+        if hooks is not None:
+            hooks.on_expand(cur_state)
+        depth = depths[cur_state] + 1
+        for neighbor in get_neighbors(cur_state):
+            if hooks is not None:
+                hooks.on_generate(neighbor, cur_state)
+            if neighbor in parents:
+                if hooks is not None:
+                    hooks.on_duplicate(neighbor, cur_state)
+                continue
+            parents[neighbor] = cur_state
+            depths[neighbor] = depth
+            next_layer.append(neighbor)
+            if neighbor in other_depths:
+                length = depth + other_depths[neighbor]
+                if best_length is None or length < best_length:
+                    meeting_state, best_length = neighbor, length
+    return next_layer, meeting_state
 
 
-def reconstruct_path(path: Dict[Tuple[int, int], Tuple[int, int]], end: State, problem: SearchProblem[State]) -> List[State]:
+def nearest_goal_search(problem: SearchProblem[State], sources: Iterable[State],
+                        hooks: Optional[SearchHooks] = None) -> Tuple[Dict[State, Optional[List[State]]], Dict[str, float]]:
+    """
+    Finds a cheapest path from each of many sources to its nearest goal with a single search.
+
+    Instead of one search per source, one uniform-cost search grows backwards from all of
+    the goal states at once (with get_goal_states and get_predecessors). Every state it
+    settles learns its distance to the nearest goal and the next state on the way there, so
+    the search stops as soon as every source is settled, and each path is read off by
+    following those next states.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        sources (Iterable[State]): The states to find paths from.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py). on_goal is called for each source when it is settled.
+
+    Returns:
+        Tuple[Dict[State, Optional[List[State]]], Dict[str, float]]:
+            - For each source, a cheapest path from it to a goal, or None if no goal can be reached.
+            - A dictionary of statistics for the whole search, including:
+                a. 'queries': The number of distinct sources.
+                b. 'solved': The number of sources with a path.
+                c. 'states_expanded': The number of states expanded by the one shared search.
+                d. 'max_frontier_size': The maximum size of the frontier during the search.
+                e. 'path_costs': The cost of each source's path, for the sources with one.
+    """
+    stats = {"queries": 0, "solved": 0, "states_expanded": 0, "max_frontier_size": 0, "path_costs": {}}
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    goals = list(problem.get_goal_states())
+    return _multi_source_sweep(problem, goals, list(dict.fromkeys(sources)), weighted_predecessors, stats, hooks, reverse=True)
+
+
+def multi_source_search(problem: SearchProblem[State], sources: Iterable[State], targets: Optional[Iterable[State]] = None,
+                        hooks: Optional[SearchHooks] = None) -> Tuple[Dict[State, Optional[List[State]]], Dict[str, float]]:
+    """
+    Finds a cheapest path to each of many targets from whichever of the sources is nearest,
+    with a single search.
+
+    One uniform-cost search grows forwards from all of the sources at once, so it needs only
+    get_successors. Every state it settles learns its distance from the nearest source and the
+    state it was reached from; the search stops as soon as every target is settled.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        sources (Iterable[State]): The states the paths may start from.
+        targets (Optional[Iterable[State]]): The states to find paths to; the problem's
+            get_goal_states by default.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py). on_goal is called for each target when it is settled.
+
+    Returns:
+        Tuple[Dict[State, Optional[List[State]]], Dict[str, float]]:
+            - For each target, a cheapest path to it from the nearest source, or None if no
+              source can reach it.
+            - A dictionary of statistics with the same keys as nearest_goal_search, counting
+              targets as the queries.
+    """
+    stats = {"queries": 0, "solved": 0, "states_expanded": 0, "max_frontier_size": 0, "path_costs": {}}
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    if targets is None:
+        targets = problem.get_goal_states()
+    return _multi_source_sweep(problem, list(sources), list(dict.fromkeys(targets)), weighted_successors, stats, hooks, reverse=False)
+
+
+def _multi_source_sweep(problem, roots, queries, neighbors, stats, hooks, reverse):
+    """
+    The uniform-cost search shared by nearest_goal_search and multi_source_search. It grows
+    from every root at once, following neighbors, until every query state is settled.
+    """
+    stats["queries"] = len(queries)
+    counter = count()
+    #parents maps each reached state to the state it was reached from (None for the roots)
+    parents = {}
+    costs = {}
+    frontier = []
+    for root in roots:
+        if root not in costs:
+            parents[root] = None
+            costs[root] = 0
+            frontier.append((0, next(counter), root))
+    unsettled = set(queries)
+    settled = set()
+    while frontier and unsettled:
+        cur_cost, _, cur_state = heapq.heappop(frontier)
+        if cur_state in settled:
+            continue #stale entry left behind by a cheaper route
+        settled.add(cur_state)
+        if cur_state in unsettled:
+            unsettled.discard(cur_state)
+            if hooks is not None:
+                hooks.on_goal(cur_state)
+            if not unsettled:
+                break
+        if hooks is not None:
+            hooks.on_expand(cur_state)
+        for neighbor, step_cost in neighbors(problem, cur_state):
+            if hooks is not None:
+                hooks.on_generate(neighbor, cur_state)
+            new_cost = cur_cost + step_cost
+            if neighbor not in costs or new_cost < costs[neighbor]:
+                costs[neighbor] = new_cost
+                parents[neighbor] = cur_state
+                heapq.heappush(frontier, (new_cost, next(counter), neighbor))
+            elif hooks is not None:
+                hooks.on_duplicate(neighbor, cur_state)
+        stats["states_expanded"] += 1
+        stats["max_frontier_size"] = max(stats["max_frontier_size"], len(frontier))
+
+    paths = {}
+    for query in queries:
+        if query in unsettled:
+            paths[query] = None
+            continue
+        #walk back to the root the query was reached from; the sweep from the goals already
+        # walks in the direction of the path, the sweep from the sources walks against it
+        path = [query]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        if not reverse:
+            path.reverse()
+        paths[query] = path
+        stats["solved"] += 1
+        stats["path_costs"][query] = costs[query]
+    if hooks is not None:
+        hooks.on_finish(stats)
+    return paths, stats
+
+
+def batch_bfs(problem: SearchProblem[State], hooks: Optional[SearchHooks] = None) -> Tuple[Optional[List[State]], Dict[str, int]]:
+    """
+    Performs Breadth-First Search one whole frontier layer at a time, using the problem's
+    integer state numbering (num_states, state_to_id, id_to_state) and get_successors_batch.
+
+    Parents are kept in a flat array indexed by state number instead of a dictionary of
+    states, and each layer is expanded with a single get_successors_batch call. Problems
+    that do not number their states are solved with bfs instead.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]:
+            - A list of states representing a shortest solution path, or None if no solution was found.
+            - A dictionary of search statistics with the same keys as bfs. Whole layers are
+              goal-tested before they are expanded, so 'states_expanded' counts every state in
+              the layers before the goal's.
+    """
+    return finish_search(_batch_bfs_steps(problem, report_every=None, hooks=hooks))
+
+
+
+def batch_bfs_steps(problem: SearchProblem[State], report_every: int = 1, hooks: Optional[SearchHooks] = None) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """
+    Performs a layer-at-a-time breadth-first search as a generator that can be paused and
+    resumed (see run_search for running it under a budget). Whole layers are expanded
+    between yields, so it yields after the layer that takes 'states_expanded' past each
+    multiple of report_every.
+
+    Args:
+        problem (SearchProblem[State]): The search problem to solve.
+        report_every (int): Yield the stats dictionary every report_every expansions; must
+            be at least 1, since run_search only checks its budgets when the search yields.
+        hooks (Optional[SearchHooks]): Callbacks and collectors to run during the search
+            (see search_hooks.py).
+
+    Yields:
+        Dict[str, int]: The live statistics dictionary of the search so far.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, int]]: The result of batch_bfs, as the value
+        of the StopIteration that ends the generator.
+    """
+    _check_report_every(report_every)
+    return _batch_bfs_steps(problem, report_every, hooks)
+
+
+def _batch_bfs_steps(problem: SearchProblem[State], report_every: Optional[int], hooks: Optional[SearchHooks]) -> Generator[Dict[str, int], None, Tuple[Optional[List[State]], Dict[str, int]]]:
+    """The generator behind batch_bfs_steps, which never yields when report_every is None."""
+    num_states = problem.num_states()
+    if num_states is None:
+        return (yield from _bfs_steps(problem, report_every, hooks))
+    stats = {"path_length": 0, "states_expanded": 0, "max_frontier_size": 0}
+    if hooks is not None:
+        problem = hooks.on_start(problem, stats)
+    start_id = problem.state_to_id(problem.get_start_state())
+    #parents[i] is the number of the state state i was reached from, or -1 if it was not reached yet
+    parents = np.full(num_states, -1, dtype=np.int64)
+    parents[start_id] = start_id
+    frontier = np.array([start_id], dtype=np.int64)
+    while frontier.size:
+        goals = frontier[problem.is_goal_batch(frontier)]
+        if goals.size:
+            path_ids = [int(goals[0])]
+            while path_ids[-1] != start_id:
+                path_ids.append(int(parents[path_ids[-1]]))
+            path = [problem.id_to_state(state_id) for state_id in reversed(path_ids)]
+            stats["path_length"] = len(path)
+            if hooks is not None:
+                hooks.on_goal(path[-1])
+                hooks.on_finish(stats)
+            return (path, stats)
+        sources, targets = problem.get_successors_batch(frontier)
+        reported = stats["states_expanded"]
+        stats["states_expanded"] += int(frontier.size)
+        new = parents[targets] == -1
+        #a state reached from several frontier states keeps the first of them
+        next_frontier, first = np.unique(targets[new], return_index=True)
+        if hooks is not None:
+            _report_batch(hooks, problem, frontier, sources, targets, new, first)
+        frontier = next_frontier
+        parents[frontier] = sources[new][first]
+        stats["max_frontier_size"] = max(stats["max_frontier_size"], int(frontier.size))
+        if report_every and stats["states_expanded"] // report_every > reported // report_every:
+            yield stats
+    if hooks is not None:
+        hooks.on_finish(stats)
+    return None, stats
+
+
+def _report_batch(hooks, problem, frontier, sources, targets, new, first):
+    """Calls the per-state hooks for one layer expanded by batch_bfs_steps."""
+    for state_id in frontier:
+        hooks.on_expand(problem.id_to_state(int(state_id)))
+    kept = np.zeros(len(targets), dtype=bool)
+    kept[np.flatnonzero(new)[first]] = True
+    for source, target, is_kept in zip(sources.tolist(), targets.tolist(), kept.tolist()):
+        state, parent = problem.id_to_state(target), problem.id_to_state(source)
+        hooks.on_generate(state, parent)
+        if not is_kept:
+            hooks.on_duplicate(state, parent)
+
+
+def _check_report_every(report_every: int):
+    """Raises a ValueError unless report_every is a whole number of expansions, at least 1."""
+    if not isinstance(report_every, int) or report_every < 1:
+        raise ValueError(f"report_every must be an int of at least 1, got {report_every!r}")
+
+
+def finish_search(steps: Generator[Dict[str, float], None, Tuple[Optional[List[State]], Dict[str, float]]]) -> Tuple[Optional[List[State]], Dict[str, float]]:
+    """
+    Runs a search generator such as bfs_steps to the end.
+
+    Args:
+        steps (Generator): The search to run.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, float]]: The path and statistics the search returned.
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+
+def run_search(steps: Generator[Dict[str, float], None, Tuple[Optional[List[State]], Dict[str, float]]],
+               max_expansions: Optional[int] = None, deadline_seconds: Optional[float] = None,
+               max_frontier: Optional[int] = None) -> Tuple[Optional[List[State]], Dict[str, float]]:
+    """
+    Runs a search generator such as bfs_steps until it finishes or a budget runs out.
+
+    The budgets are checked every time the search yields, so they are exact for searches
+    yielding after every expansion (report_every=1) and otherwise overshoot by at most
+    report_every expansions. A stopped search is left paused where it was: calling run_search
+    again on the same generator, with fresh budgets, carries on from there.
+
+    Args:
+        steps (Generator): The search to run.
+        max_expansions (Optional[int]): Stop once 'states_expanded' reaches this many states.
+        deadline_seconds (Optional[float]): Stop once this many seconds have passed.
+        max_frontier (Optional[int]): Stop once 'max_frontier_size' goes over this size.
+
+    Returns:
+        Tuple[Optional[List[State]], Dict[str, float]]:
+            - The solution path, or None if no solution was found or a budget ran out.
+            - A copy of the search statistics with a 'status' key added: 'solved', 'no_solution',
+              or the budget that ran out ('max_expansions', 'deadline' or 'max_frontier').
+    """
+    deadline = time.perf_counter() + deadline_seconds if deadline_seconds is not None else None
+    while True:
+        try:
+            stats = next(steps)
+        except StopIteration as stop:
+            path, stats = stop.value
+            stats = dict(stats, status="solved" if path is not None else "no_solution")
+            return path, stats
+        if max_expansions is not None and stats["states_expanded"] >= max_expansions:
+            status = "max_expansions"
+        elif max_frontier is not None and stats["max_frontier_size"] > max_frontier:
+            status = "max_frontier"
+        elif deadline is not None and time.perf_counter() >= deadline:
+            status = "deadline"
+        else:
+            continue
+        return None, dict(stats, status=status)
+
+
+
+def weighted_successors(problem: SearchProblem[State], state: State) -> Iterable[Tuple[State, float]]:
+    """
+    Produces (successor, cost) pairs for the given state.
+
+    Args:
+        problem (SearchProblem[State]): The search problem being solved.
+        state (State): The state to expand.
+
+    Returns:
+        Iterable[Tuple[State, float]]: The successors of state with their edge costs;
+        a cost of 1 is used when the problem does not report costs.
+    """
+    successors = problem.get_successors(state)
+    if isinstance(successors, dict):
+        return successors.items()
+    return ((successor, 1) for successor in successors)
+
+
+def weighted_predecessors(problem: SearchProblem[State], state: State) -> Iterable[Tuple[State, float]]:
+    """
+    Produces (predecessor, cost) pairs for the given state, like weighted_successors but
+    following moves backwards with get_predecessors.
+
+    Args:
+        problem (SearchProblem[State]): The search problem being solved.
+        state (State): The state to find the predecessors of.
+
+    Returns:
+        Iterable[Tuple[State, float]]: The predecessors of state with the costs of their edges
+        into it; a cost of 1 is used when the problem does not report costs.
+    """
+    predecessors = problem.get_predecessors(state)
+    if isinstance(predecessors, dict):
+        return predecessors.items()
+    return ((predecessor, 1) for predecessor in predecessors)
+
+
+def null_heuristic(state: State, problem: SearchProblem[State]) -> float:
+    """A heuristic that estimates every state as 0 steps from the goal."""
+    return 0
+
+
+def manhattan_heuristic(state: MazeState, problem: Maze) -> int:
+    """
+    Estimates the number of moves from state to the maze's goal, ignoring walls.
+
+    Args:
+        state (MazeState): The state to estimate from.
+        problem (Maze): The maze being solved.
+
+    Returns:
+        int: The Manhattan distance between state.location and problem.goal_state.location.
+    """
+    row, col = state.location
+    goal_row, goal_col = problem.goal_state.location
+    return abs(row - goal_row) + abs(col - goal_col)
+
+
+
+def reconstruct_path(path: Dict[State, Optional[State]], end: State, problem: SearchProblem[State]) -> List[State]:
     """
     Reconstructs the path from the start state to the given end state.
 
     Args:
-        path (Dict[Tuple[int, int], Tuple[int, int]]): A dictionary mapping each state 
+        path (Dict[State, Optional[State]]): A dictionary mapping each state 
         to its predecessor in the search.
         end (State): The goal state to trace back from.
         problem (SearchProblem[State]): The search problem to solve.
@@ -118,6 +847,12 @@ def main():
     dfs_path, dfs_stats = dfs(maze)
     print(dfs_path)
     print("dfs_stats ", dfs_stats)
+
+    # Run A* with the Manhattan heuristic to find paths
+    print("A* Path:")
+    astar_path, astar_stats = astar(maze, manhattan_heuristic)
+    print(astar_path)
+    print("astar_stats ", astar_stats)
     # maze.visualize_maze(path=dfs_path, algorithm_name="dfs")
 
 
@@ -0,0 +1,211 @@
+# Instrumentation for the search functions in search.py.
+#
+# Every search function in search.py takes a hooks argument (maze_array.array_bfs does not; see
+# its docstring). With the default, None, a search makes one "is None" check per expansion and
+# per successor and nothing else. Otherwise hooks is a SearchHooks object whose methods are
+# called as the search runs:
+#
+#   on_start(problem, stats)   before the search starts; returns the problem to search, which
+#                              lets a collector wrap it (see TimingCollector)
+#   on_expand(state)           when a state is taken off the frontier and expanded
+#   on_generate(state, parent) for every successor produced by an expansion
+#   on_duplicate(state, parent) for the successors that were dropped because they had already
+#                              been reached (at no lower cost, for ucs and astar)
+#   on_goal(state)             when a goal state is found
+#   on_finish(stats)           when the search returns, to add entries to its stats
+#
+# A search stopped by a run_search budget never returns, so on_finish is not called for it.
+
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from search_problem import ProblemWrapper, SearchProblem, State
+
+
+class SearchHooks:
+    """
+    The callbacks a search makes. Every method does nothing by default, so subclasses only
+    override the events they need.
+    """
+    def on_start(self, problem: SearchProblem[State], stats: Dict[str, float]) -> SearchProblem[State]:
+        return problem
+
+    def on_expand(self, state: State):
+        pass
+
+    def on_generate(self, state: State, parent: State):
+        pass
+
+    def on_duplicate(self, state: State, parent: State):
+        pass
+
+    def on_goal(self, state: State):
+        pass
+
+    def on_finish(self, stats: Dict[str, float]):
+        pass
+
+
+class HookList(SearchHooks):
+    """Calls several SearchHooks in turn, e.g. HookList(CountingCollector(), TimingCollector())."""
+    def __init__(self, *hooks: SearchHooks):
+        self.hooks = hooks
+
+    def on_start(self, problem: SearchProblem[State], stats: Dict[str, float]) -> SearchProblem[State]:
+        for hook in self.hooks:
+            problem = hook.on_start(problem, stats)
+        return problem
+
+    def on_expand(self, state: State):
+        for hook in self.hooks:
+            hook.on_expand(state)
+
+    def on_generate(self, state: State, parent: State):
+        for hook in self.hooks:
+            hook.on_generate(state, parent)
+
+    def on_duplicate(self, state: State, parent: State):
+        for hook in self.hooks:
+            hook.on_duplicate(state, parent)
+
+    def on_goal(self, state: State):
+        for hook in self.hooks:
+            hook.on_goal(state)
+
+    def on_finish(self, stats: Dict[str, float]):
+        for hook in self.hooks:
+            hook.on_finish(stats)
+
+
+class CountingCollector(SearchHooks):
+    """
+    Counts expansions and generated and duplicate successors, and adds to the stats:
+        a. 'seconds': The wall-clock time of the search.
+        b. 'expansions_per_second': states_expanded / seconds.
+        c. 'states_generated': The number of successors produced by expansions.
+        d. 'duplicate_rate': The fraction of them that had already been reached.
+    """
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self._started = None
+
+    def on_start(self, problem: SearchProblem[State], stats: Dict[str, float]) -> SearchProblem[State]:
+        self._started = time.perf_counter()
+        return problem
+
+    def on_expand(self, state: State):
+        self.expanded += 1
+
+    def on_generate(self, state: State, parent: State):
+        self.generated += 1
+
+    def on_duplicate(self, state: State, parent: State):
+        self.duplicates += 1
+
+    def on_finish(self, stats: Dict[str, float]):
+        seconds = time.perf_counter() - self._started
+        stats["seconds"] = seconds
+        stats["expansions_per_second"] = stats["states_expanded"] / seconds if seconds > 0 else 0.0
+        stats["states_generated"] = self.generated
+        stats["duplicate_rate"] = self.duplicates / self.generated if self.generated else 0.0
+
+
+class TimingCollector(SearchHooks):
+    """
+    Splits the wall-clock time of a search into phases, by searching a TimedProblem wrapped
+    around the problem, and adds to the stats:
+        a. 'successor_seconds': The time spent in get_successors (and get_predecessors and
+           get_successors_batch).
+        b. 'goal_test_seconds': The time spent in is_goal_state (and is_goal_batch).
+        c. 'frontier_seconds': The rest of the search: frontier and visited-set operations,
+           path reconstruction and any other hooks.
+    """
+    def __init__(self):
+        self.problem = None
+        self._started = None
+
+    def on_start(self, problem: SearchProblem[State], stats: Dict[str, float]) -> SearchProblem[State]:
+        self.problem = TimedProblem(problem)
+        self._started = time.perf_counter()
+        return self.problem
+
+    def on_finish(self, stats: Dict[str, float]):
+        seconds = time.perf_counter() - self._started
+        stats["successor_seconds"] = self.problem.successor_seconds
+        stats["goal_test_seconds"] = self.problem.goal_test_seconds
+        stats["frontier_seconds"] = max(0.0, seconds - self.problem.successor_seconds - self.problem.goal_test_seconds)
+
+
+class MemoryCollector(SearchHooks):
+    """
+    Records the peak memory allocated by Python during the search with tracemalloc, as
+    'peak_memory_bytes' in the stats. Tracing slows allocation down a lot, so the other
+    collectors' timings are not representative when this one is attached too.
+    """
+    def __init__(self):
+        self._started_tracing = False
+        self._baseline = 0
+
+    def on_start(self, problem: SearchProblem[State], stats: Dict[str, float]) -> SearchProblem[State]:
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        return problem
+
+    def on_finish(self, stats: Dict[str, float]):
+        stats["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1] - self._baseline
+        if self._started_tracing:
+            tracemalloc.stop()
+
+
+class TimedProblem(ProblemWrapper[State]):
+    """
+    Wraps a SearchProblem and adds up the time spent in its successor and goal-test methods.
+    Everything else is passed through to the wrapped problem (see ProblemWrapper).
+
+    Attributes:
+        problem (SearchProblem[State]): The wrapped problem.
+        successor_seconds (float): The time spent producing successors or predecessors.
+        goal_test_seconds (float): The time spent testing for goals.
+    """
+    def __init__(self, problem: SearchProblem[State]):
+        super().__init__(problem)
+        self.successor_seconds = 0.0
+        self.goal_test_seconds = 0.0
+
+    def is_goal_state(self, state: State) -> bool:
+        started = time.perf_counter()
+        result = self.problem.is_goal_state(state)
+        self.goal_test_seconds += time.perf_counter() - started
+        return result
+
+    def get_successors(self, state: State) -> List[State]:
+        started = time.perf_counter()
+        result = self.problem.get_successors(state)
+        self.successor_seconds += time.perf_counter() - started
+        return result
+
+    def get_predecessors(self, state: State) -> List[State]:
+        started = time.perf_counter()
+        result = self.problem.get_predecessors(state)
+        self.successor_seconds += time.perf_counter() - started
+        return result
+
+    def get_successors_batch(self, state_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        started = time.perf_counter()
+        result = self.problem.get_successors_batch(state_ids)
+        self.successor_seconds += time.perf_counter() - started
+        return result
+
+    def is_goal_batch(self, state_ids: np.ndarray) -> np.ndarray:
+        started = time.perf_counter()
+        result = self.problem.is_goal_batch(state_ids)
+        self.goal_test_seconds += time.perf_counter() - started
+        return result
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Generic, Hashable, TypeVar
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+
+import numpy as np
 
 # In SearchProblem, we require that all states are hashable so that we can
 # represent successive states as a dictionary.
@@ -11,6 +14,9 @@ from typing import Dict, Generic, Hashable, TypeVar
 State = TypeVar("State", bound=Hashable)
 
 class SearchProblem(ABC, Generic[State]):
+    # Counts in-place edits (see mark_changed), so that cached results can tell they are stale
+    revision = 0
+
     @abstractmethod
     def get_start_state(self) -> State:
         """
@@ -32,3 +38,208 @@ class SearchProblem(ABC, Generic[State]):
         each associated key.
         """
         pass
+
+    def get_goal_states(self) -> Iterable[State]:
+        """
+        Produces the goal states, for searches that grow backwards from the goal.
+        Problems whose goals are only known through is_goal_state do not override this.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not list its goal states")
+
+    def get_predecessors(self, state: State) -> list[State]:
+        """
+        Produces a list of the states from which the given state can be reached,
+        in the same format as get_successors.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support predecessor lookups")
+
+    # Optional integer encoding of states. Problems that implement num_states, state_to_id,
+    # id_to_state and get_successors_batch let batch_bfs keep its bookkeeping in flat arrays
+    # and expand a whole frontier per call; other problems are searched one state at a time.
+
+    def num_states(self) -> Optional[int]:
+        """
+        Produces the number of states if they are numbered 0 to num_states() - 1 by state_to_id,
+        or None if the problem does not number its states.
+        """
+        return None
+
+    def state_to_id(self, state: State) -> int:
+        """
+        Produces the number of the given state, between 0 and num_states() - 1.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not number its states")
+
+    def id_to_state(self, state_id: int) -> State:
+        """
+        Produces the state with the given number; the inverse of state_to_id.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not number its states")
+
+    def get_successors_batch(self, state_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Produces every move out of the states with the given numbers as two equally long
+        arrays: the number of the state each move leaves from, and the number of the state
+        it reaches.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batched successors")
+
+    def is_goal_batch(self, state_ids: np.ndarray) -> np.ndarray:
+        """
+        Produces a boolean array saying which of the numbered states are goal states.
+        """
+        return np.fromiter((self.is_goal_state(self.id_to_state(int(state_id))) for state_id in state_ids),
+                           dtype=bool, count=len(state_ids))
+
+    # Optional serialization of states, for searches that keep states on disk (see
+    # external_search.py). Equal states must encode to equal bytes.
+
+    def encode_state(self, state: State) -> bytes:
+        """
+        Produces a compact byte string that decode_state turns back into the given state.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not serialize its states")
+
+    def decode_state(self, data: bytes) -> State:
+        """
+        Produces the state encoded by encode_state.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not serialize its states")
+
+    def mark_changed(self):
+        """
+        Records that the problem was edited in place (e.g. a wall or edge was changed), so that
+        anything cached about it, such as by CachedProblem, is thrown away.
+        """
+        self.revision += 1
+
+
+class ProblemWrapper(SearchProblem[State]):
+    """
+    A SearchProblem that passes every method, and any other attribute such as goal_state, on
+    to the problem it wraps. Wrappers like CachedProblem and search_hooks.TimedProblem
+    subclass it and override only the methods they change, so a wrapped problem can be given
+    to any search function in place of the original.
+
+    Attributes:
+        problem (SearchProblem[State]): The wrapped problem.
+    """
+    def __init__(self, problem: SearchProblem[State]):
+        self.problem = problem
+
+    def get_start_state(self) -> State:
+        return self.problem.get_start_state()
+
+    def is_goal_state(self, state: State) -> bool:
+        return self.problem.is_goal_state(state)
+
+    def get_successors(self, state: State) -> list[State]:
+        return self.problem.get_successors(state)
+
+    def get_goal_states(self) -> Iterable[State]:
+        return self.problem.get_goal_states()
+
+    def get_predecessors(self, state: State) -> list[State]:
+        return self.problem.get_predecessors(state)
+
+    @property
+    def revision(self) -> int:
+        return self.problem.revision
+
+    def mark_changed(self):
+        self.problem.mark_changed()
+
+    def num_states(self) -> Optional[int]:
+        return self.problem.num_states()
+
+    def state_to_id(self, state: State) -> int:
+        return self.problem.state_to_id(state)
+
+    def id_to_state(self, state_id: int) -> State:
+        return self.problem.id_to_state(state_id)
+
+    def get_successors_batch(self, state_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self.problem.get_successors_batch(state_ids)
+
+    def is_goal_batch(self, state_ids: np.ndarray) -> np.ndarray:
+        return self.problem.is_goal_batch(state_ids)
+
+    def encode_state(self, state: State) -> bytes:
+        return self.problem.encode_state(state)
+
+    def decode_state(self, data: bytes) -> State:
+        return self.problem.decode_state(data)
+
+    def __getattr__(self, name):
+        # only called for attributes the wrapper does not have itself
+        if name == "problem":
+            raise AttributeError(name)
+        return getattr(self.problem, name)
+
+
+class CachedProblem(ProblemWrapper[State]):
+    """
+    Wraps a SearchProblem and memoizes get_successors and is_goal_state, keeping at most
+    maxsize results of each and evicting the least recently used.
+
+    The cache is emptied whenever the wrapped problem's revision changes (see mark_changed),
+    and a result is not cached if the problem changed while it was being computed, as
+    MazeGenerator does by carving walls inside get_successors. The revision is the only thing
+    checked: Maze.set_wall and DirectedGraph.set_edge call mark_changed for you, but after
+    editing a maze's board or a graph's matrix directly, call mark_changed (or
+    Maze.invalidate_successors) yourself, or stale successors will be served. Everything else, including
+    get_predecessors and attributes like goal_state, is passed through to the wrapped problem
+    (see ProblemWrapper), so a CachedProblem can be given to any search function in its place. The batched methods
+    (get_successors_batch and is_goal_batch) are passed through without caching.
+
+    Attributes:
+        problem (SearchProblem[State]): The wrapped problem.
+        maxsize (int): The maximum number of results kept for each of the two methods.
+        hits (int): The number of calls answered from the cache.
+        misses (int): The number of calls passed on to the wrapped problem.
+        evictions (int): The number of results evicted to stay within maxsize.
+    """
+    def __init__(self, problem: SearchProblem[State], maxsize: int = 1 << 16):
+        super().__init__(problem)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._successors = OrderedDict()
+        self._goal_tests = OrderedDict()
+        self._seen_revision = problem.revision
+
+    def is_goal_state(self, state: State) -> bool:
+        return self._lookup(self._goal_tests, self.problem.is_goal_state, state)
+
+    def get_successors(self, state: State) -> list[State]:
+        return self._lookup(self._successors, self.problem.get_successors, state)
+
+    def clear(self):
+        """Empties the cache. The counters are kept."""
+        self._successors.clear()
+        self._goal_tests.clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        """Produces the hit, miss and eviction counters and the number of cached results."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._successors) + len(self._goal_tests)}
+
+    def _lookup(self, cache: OrderedDict, compute, state: State):
+        revision = self.problem.revision
+        if revision != self._seen_revision:
+            self.clear()
+            self._seen_revision = revision
+        if state in cache:
+            self.hits += 1
+            cache.move_to_end(state)
+            return cache[state]
+        self.misses += 1
+        result = compute(state)
+        if self.problem.revision != revision:
+            return result  # the problem changed while computing the result, so it cannot be reused
+        cache[state] = result
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+            self.evictions += 1
+        return result
@@ -1,8 +1,33 @@
+import asyncio
+import os
+import tempfile
 import unittest
 
-from maze import Maze
-from directed_graph import DirectedGraph #I added this so I could test with directed_graphs
-from search import bfs, dfs
+import matplotlib.pyplot as plt
+import numpy as np
+
+from maze import Maze, MazeState, GENERATION_ALGORITHMS, eller_rows
+from maze_generator import MazeGenerator
+from search_problem import CachedProblem
+from directed_graph import DirectedGraph, SparseDirectedGraph #I added this so I could test with directed_graphs
+from search import bfs, dfs, ucs, astar, manhattan_heuristic, bidirectional_bfs, batch_bfs, weighted_successors, \
+    nearest_goal_search, multi_source_search, \
+    bfs_steps, dfs_steps, ucs_steps, astar_steps, bidirectional_bfs_steps, batch_bfs_steps, run_search
+from maze_array import ArrayMaze, array_bfs
+from maze_file import MappedMaze, write_rows
+from maze_render import render_maze, wall_image
+from maze_contraction import ContractedMaze, solve_contracted
+from graph_file import EDGE_RECORD, build_graph_file, open_graph_file
+from search_hooks import SearchHooks, HookList, CountingCollector, TimingCollector, MemoryCollector
+from benchmark import run_benchmarks, write_results, read_results, compare
+from batch_solver import MazeSpec, solve_batch
+from maze_index import MazePathIndex
+from landmarks import LandmarkIndex
+from benchmark import random_graph
+from incremental import IncrementalPlanner
+from external_search import external_bfs
+from async_search import FakeGraphStore, async_bfs, async_astar
+from bulk_maze import BULK_ALGORITHMS, generate_mazes, write_dataset, load_mazes
 
 class IOTest(unittest.TestCase):
     """
@@ -51,6 +76,26 @@ class IOTest(unittest.TestCase):
         self.assertTrue(path_is_valid(path),
                         "Path should only take valid moves")
 
+    def _no_solution_graph(self):
+        """A graph whose goal, node 1, has no edges into it."""
+        return DirectedGraph([
+            [None, None, 1, 1],
+            [None, None, 1, 1],
+            [None, None, None, 1],
+            [None, None, None, None]
+        ], {1}, start_state=0)
+
+    def _braided_maze(self, width, height, seed, col):
+        """
+        A braided maze: a perfect (Kruskal) maze with the east wall of every odd row knocked
+        through at column col, so it has loops.
+        """
+        maze = Maze(width, height, algorithm="kruskal", seed=seed)
+        for row in range(1, height - 1, 2):
+            maze.remove_wall(row, col, "east")
+        return maze
+
+
     def test_bfs_on_maze(self):
         single_cell_maze = Maze(1, 1)
         self._check_maze(bfs, single_cell_maze, 1)
@@ -128,6 +173,10 @@ class IOTest(unittest.TestCase):
         ], {1}, start_state=0)
         no_path2, _ = bfs(no_solution_graph2)
         self.assertEqual(no_path2, None)        
+        #dfs should also return a (path, stats) tuple when there is no solution
+        no_path3, no_path_stats = dfs(no_solution_graph2)
+        self.assertEqual(no_path3, None)
+        self.assertEqual(no_path_stats["path_length"], 0)
 
 
     def test_dfs_on_maze(self):
@@ -157,6 +206,669 @@ class IOTest(unittest.TestCase):
         self._check_maze(dfs, diff_start_and_goal_wide, 4)
 
 
+    def test_ucs_and_astar(self):
+        #the direct edge 0 -> 3 is the fewest steps but not the cheapest path
+        weighted_graph = DirectedGraph([
+            [None, 1, None, 10],
+            [None, None, 2, None],
+            [None, None, None, 3],
+            [None, None, None, None]
+        ], {3}, start_state=0)
+        path, stats = ucs(weighted_graph)
+        self.assertEqual(path, [0, 1, 2, 3])
+        self.assertEqual(stats["path_cost"], 6)
+        self._check_maze(ucs, weighted_graph, length=4)
+
+        large_maze = Maze(15, 15)
+        self._check_maze(ucs, large_maze)
+        self._check_maze(lambda maze: astar(maze, manhattan_heuristic), large_maze)
+        bfs_path, bfs_stats = bfs(large_maze)
+        astar_path, astar_stats = astar(large_maze, manhattan_heuristic)
+        self.assertEqual(len(astar_path), len(bfs_path))
+        self.assertEqual(astar_stats["path_cost"], len(bfs_path) - 1)
+        self.assertLessEqual(astar_stats["states_expanded"], bfs_stats["states_expanded"])
+
+        no_path, _ = astar(DirectedGraph([[None, None], [None, None]], {1}))
+        self.assertEqual(no_path, None)
+
+
+    def test_bidirectional_bfs(self):
+        single_cell_maze = Maze(1, 1)
+        self._check_maze(bidirectional_bfs, single_cell_maze, 1)
+
+        large_maze = Maze(12, 12, start=(3, 4), goal=(9, 1))
+        bfs_path, _ = bfs(large_maze)
+        self._check_maze(bidirectional_bfs, large_maze, len(bfs_path))
+
+        mulit_solution_paths_graph2 = DirectedGraph([
+            [1, None, 1, 1],
+            [None, 1, 1, 1],
+            [None, 1, 1, 1],
+            [1, None, 1, 1]
+        ], {1}, start_state=0)
+        self._check_maze(bidirectional_bfs, mulit_solution_paths_graph2, length=3)
+
+        no_solution_graph = self._no_solution_graph()
+        no_path, stats = bidirectional_bfs(no_solution_graph)
+        self.assertEqual(no_path, None)
+        self.assertEqual(stats["states_expanded"],
+                         stats["forward_states_expanded"] + stats["backward_states_expanded"])
+
+
+    def test_array_maze(self):
+        maze = Maze(9, 7, start=(1, 2), goal=(6, 8))
+        array_maze = ArrayMaze.from_maze(maze)
+        self._check_maze(array_bfs, array_maze)
+        self._check_maze(bfs, array_maze)
+        bfs_path, _ = bfs(maze)
+        array_path, _ = array_bfs(array_maze)
+        self.assertEqual([state.location for state in array_path],
+                         [state.location for state in bfs_path])
+
+        round_trip = array_maze.to_maze()
+        for row in range(maze.height):
+            for col in range(maze.width):
+                self.assertEqual(round_trip.board[row][col].to_mask(), maze.board[row][col].to_mask())
+        self._check_maze(bfs, round_trip, len(bfs_path))
+
+        walled_off = ArrayMaze.from_maze(Maze(3, 3, self_generating=False))
+        no_path, _ = array_bfs(walled_off)
+        self.assertEqual(no_path, None)
+
+
+    def test_maze_states_are_shared(self):
+        maze = Maze(2, 1, self_generating=False)
+        self.assertIs(maze.get_state(0, 0), maze.get_start_state())
+        self.assertEqual(maze.get_successors(maze.get_start_state()), ())
+
+        #opening a wall is only seen once the cached successors are invalidated
+        maze.board[0][0].east = 0
+        maze.board[0][1].west = 0
+        maze.invalidate_successors([(0, 0), (0, 1)])
+        successors = maze.get_successors(maze.get_start_state())
+        self.assertEqual(len(successors), 1)
+        self.assertIs(successors[0], maze.goal_state)
+
+        #remove_wall invalidates the cache itself, for both bfs and batch_bfs
+        opened = Maze(2, 1, self_generating=False)
+        self.assertEqual((bfs(opened)[0], batch_bfs(opened)[0]), (None, None))
+        opened.remove_wall(0, 0, "east")
+        self.assertEqual(bfs(opened)[0], [opened.start_state, opened.goal_state])
+        self.assertEqual(batch_bfs(opened)[0], [opened.start_state, opened.goal_state])
+
+        #closing the wall again with set_wall stops bfs (and a cache over the maze) using it
+        cached = CachedProblem(opened)
+        self.assertEqual(len(bfs(cached)[0]), 2)
+        opened.set_wall(0, 1, "west", True)
+        self.assertEqual((opened.board[0][0].east, opened.board[0][1].west), (1, 1))
+        self.assertEqual((bfs(opened)[0], batch_bfs(opened)[0], bfs(cached)[0]), (None, None, None))
+        self.assertRaises(ValueError, opened.set_wall, 0, 0, "north", False)
+        self.assertIs(maze.get_successors(maze.get_start_state()), successors)
+
+
+    def test_generation_algorithms(self):
+        for algorithm in GENERATION_ALGORITHMS:
+            #a perfect maze has one fewer passage than rooms and every room is reachable
+            maze = Maze(13, 9, algorithm=algorithm, seed=7)
+            passages = sum(room.south == 0 for row in maze.board for room in row) + \
+                       sum(room.east == 0 for row in maze.board for room in row)
+            self.assertEqual(passages, 13 * 9 - 1, algorithm)
+            self._check_maze(bfs, maze)
+            self._check_maze(dfs, maze)
+
+            same_seed = Maze(13, 9, algorithm=algorithm, seed=7)
+            self.assertEqual([[room.to_mask() for room in row] for row in same_seed.board],
+                             [[room.to_mask() for room in row] for row in maze.board])
+
+        #far more rooms than the recursion limit allows a recursive walk to visit
+        long_maze = Maze(300, 20, seed=1)
+        self._check_maze(bfs, long_maze)
+
+        with self.assertRaises(ValueError):
+            Maze(3, 3, algorithm="prim")
+
+
+    def test_eller_rows_streamed_to_file(self):
+        width, height = 11, 40
+        rows = [list(row) for row in eller_rows(width, height, seed=5)]
+        self.assertEqual(len(rows), height)
+        array_maze = ArrayMaze(rows)
+        self.assertTrue((array_maze.walls == rows).all(), "outer walls should already be closed")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tall.maze")
+            write_rows(path, width, height, eller_rows(width, height, seed=5), goal=(39, 0))
+            with MappedMaze(path) as mapped_maze:
+                self.assertEqual([[mapped_maze.wall_mask(row, col) for col in range(width)]
+                                  for row in range(height)], rows)
+                self._check_maze(bfs, mapped_maze)
+                path_states, _ = bfs(mapped_maze)
+                array_path, _ = array_bfs(ArrayMaze(rows, goal=(39, 0)))
+                self.assertEqual(len(array_path), len(path_states))
+
+
+    def test_save_and_load(self):
+        maze = Maze(7, 5, start=(4, 1), goal=(0, 6), algorithm="kruskal", seed=3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "saved.maze")
+            maze.save(path)
+            with Maze.load(path) as loaded:
+                self.assertEqual((loaded.width, loaded.height), (7, 5))
+                self.assertEqual(loaded.get_start_state(), maze.get_start_state())
+                self.assertEqual(loaded.goal_state, maze.goal_state)
+                self.assertEqual([[room.to_mask() for room in row] for row in loaded.board],
+                                 [[room.to_mask() for room in row] for row in maze.board])
+                self._check_maze(bfs, loaded, len(bfs(maze)[0]))
+                #the board is read-only, so editing it is an error rather than silently lost
+                self.assertRaises(ValueError, loaded.remove_wall, 0, 0, "east")
+                #saving over the file the maze is still reading from is safe
+                loaded.save(path)
+                self._check_maze(bfs, loaded, len(bfs(maze)[0]))
+            self.assertEqual(os.listdir(directory), ["saved.maze"])
+            with Maze.load(path) as reloaded:
+                self.assertEqual([[room.to_mask() for room in row] for row in reloaded.board],
+                                 [[room.to_mask() for room in row] for row in maze.board])
+
+            with open(path, "r+b") as file:
+                file.truncate(os.path.getsize(path) - 1)
+            with self.assertRaises(ValueError):
+                Maze.load(path)
+
+
+    def test_render_maze(self):
+        closed_room = wall_image(ArrayMaze.from_maze(Maze(1, 1, self_generating=False)).walls)
+        self.assertEqual(closed_room.tolist(), [[True, True, True], [True, False, True], [True, True, True]])
+
+        maze = Maze(6, 4, seed=4)
+        path, _ = bfs(maze)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "maze.png")
+            render_maze(maze, filename, path=path, expanded=path[:3], scale=3)
+            image = plt.imread(filename)
+        self.assertEqual(image.shape[:2], (3 * 9, 3 * 13))
+
+
+    def test_corridor_contraction(self):
+        for algorithm in GENERATION_ALGORITHMS:
+            maze = Maze(15, 10, start=(2, 3), goal=(8, 12), algorithm=algorithm, seed=11)
+            bfs_path, _ = bfs(maze)
+            path, stats = solve_contracted(maze)
+            self.assertEqual([state.location for state in path], [state.location for state in bfs_path])
+            self.assertEqual(stats["path_length"], len(bfs_path))
+            self.assertEqual(stats["maze_states"], 15 * 10)
+            self.assertLess(stats["contracted_states"], stats["maze_states"])
+            self._check_maze(lambda maze: solve_contracted(maze), maze, len(bfs_path))
+
+        #a maze with loops: remove every inner wall in the middle row
+        loopy_maze = Maze(8, 6, seed=2)
+        for col in range(7):
+            loopy_maze.remove_wall(3, col, 'east')
+        path, _ = solve_contracted(loopy_maze)
+        self.assertEqual(len(path), len(bfs(loopy_maze)[0]))
+
+        single_cell_maze = Maze(1, 1)
+        self.assertEqual(ContractedMaze(single_cell_maze).maze_states, 1)
+        self._check_maze(lambda maze: solve_contracted(maze), single_cell_maze, 1)
+
+
+    def test_sparse_directed_graph(self):
+        matrix = [
+            [1, None, 1, 1],
+            [None, 1, 1, 1],
+            [None, 1, 1, 1],
+            [1, None, 1, 1]
+        ]
+        dense_graph = DirectedGraph(matrix, {1}, start_state=0)
+        sparse_graph = SparseDirectedGraph.from_matrix(matrix, {1}, start_state=0)
+        for node in range(4):
+            self.assertEqual(sparse_graph.get_successors(node), dense_graph.get_successors(node))
+            self.assertEqual(sparse_graph.get_predecessors(node), dense_graph.get_predecessors(node))
+        self._check_maze(bfs, sparse_graph, length=3)
+        self._check_maze(bidirectional_bfs, sparse_graph, length=3)
+
+        #edges in any order, with a repeated edge whose cheapest copy should be used
+        sparse_graph = SparseDirectedGraph.from_edges(
+            5, [(2, 3, 3.0), (0, 1, 1.0), (1, 2, 2.0), (0, 3, 9.0), (2, 3, 1.0), (3, 4, 1.0)], {4})
+        self.assertEqual(sparse_graph.num_edges, 6)
+        self.assertEqual(sparse_graph.get_successors(2), {3: 1.0})
+        self.assertEqual(sparse_graph.get_successors(4), {})
+        path, stats = ucs(sparse_graph)
+        self.assertEqual(path, [0, 1, 2, 3, 4])
+        self.assertEqual(stats["path_cost"], 5.0)
+        self.assertEqual(bfs(sparse_graph)[1]["path_length"], 3)
+
+
+    def test_graph_file(self):
+        #the repeated (2, 3) edge comes cheapest first, so keeping the last copy would be wrong
+        edges = [(2, 3, 1.0), (0, 1, 1.0), (1, 2, 2.0), (0, 3, 9.0), (3, 4, 1.0), (0, 2, 4.0), (2, 3, 3.0)]
+        expected = SparseDirectedGraph.from_edges(5, edges, {4})
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, "edges.txt")
+            with open(text_path, "w") as file:
+                file.write("# source target weight\n")
+                file.writelines(f"{source} {target} {weight}\n" for source, target, weight in edges)
+            binary_path = os.path.join(directory, "edges.bin")
+            np.array(edges, dtype=EDGE_RECORD).tofile(binary_path)
+
+            for edge_path, binary in ((text_path, False), (binary_path, True)):
+                graph_path = os.path.join(directory, "graph.csr")
+                #a tiny chunk size makes sure edges are placed correctly across chunks
+                self.assertEqual(build_graph_file(edge_path, graph_path, binary=binary, chunk_edges=2), (5, 7))
+                graph = open_graph_file(graph_path, {4})
+                for node in range(5):
+                    self.assertEqual(graph.get_successors(node), expected.get_successors(node))
+                    self.assertEqual(graph.get_predecessors(node), expected.get_predecessors(node))
+                path, stats = ucs(graph)
+                self.assertEqual(path, [0, 1, 2, 3, 4])
+                self.assertEqual(stats["path_cost"], 5.0)
+                self.assertEqual(graph.get_successors(2), {3: 1.0})
+
+            unweighted_path = os.path.join(directory, "unweighted.txt")
+            with open(unweighted_path, "w") as file:
+                file.write("0 1\n\n1 2\n")
+            build_graph_file(unweighted_path, graph_path, num_nodes=4)
+            graph = open_graph_file(graph_path, {2})
+            self.assertEqual(graph.num_nodes, 4)
+            self.assertEqual(ucs(graph)[1]["path_cost"], 2.0)
+
+
+    def test_cached_problem(self):
+        matrix = [
+            [None, 1, 1, 1],
+            [None, None, 1, 1],
+            [None, None, None, 1],
+            [None, None, None, None]
+        ]
+        graph = DirectedGraph(matrix, {3}, start_state=0)
+        cached_graph = CachedProblem(graph, maxsize=2)
+        self._check_maze(bfs, cached_graph, length=2)
+        bfs(cached_graph)
+        self.assertGreater(cached_graph.hits, 0)
+        self.assertGreater(cached_graph.evictions, 0)
+        self.assertLessEqual(cached_graph.cache_info()["size"], 4)
+        self.assertIs(cached_graph.goal_indices, graph.goal_indices)
+
+        #editing the graph in place must not leave stale successors behind
+        self.assertEqual(cached_graph.get_successors(0), {1: 1, 2: 1, 3: 1})
+        matrix[0][3] = None
+        graph.mark_changed()
+        self.assertEqual(cached_graph.get_successors(0), {1: 1, 2: 1})
+        self._check_maze(bfs, cached_graph, length=3)
+        #set_edge calls mark_changed itself, which also rebuilds the batched view
+        graph.get_successors_batch(np.array([0]))
+        graph.set_edge(0, 3, 1)
+        self.assertEqual(cached_graph.get_successors(0), {1: 1, 2: 1, 3: 1})
+        self.assertEqual(sorted(graph.get_successors_batch(np.array([0]))[1].tolist()), [1, 2, 3])
+        self._check_maze(bfs, cached_graph, length=2)
+        #without mark_changed, a direct edit is not seen: the contract is explicit invalidation
+        matrix[0][3] = None
+        self.assertEqual(cached_graph.get_successors(0), {1: 1, 2: 1, 3: 1})
+        graph.mark_changed()
+        self.assertEqual(cached_graph.get_successors(0), {1: 1, 2: 1})
+
+        #MazeGenerator carves walls while expanding, so none of its results may be reused
+        generator = MazeGenerator(4, 4)
+        path, _ = bfs(CachedProblem(generator))
+        self.assertEqual(generator.visited_cells_count, 16)
+        self._check_maze(bfs, Maze(4, 4, self_generating=False, board=path[-1].board))
+
+
+    def test_batch_bfs(self):
+        for maze in (Maze(1, 1), Maze(12, 9, start=(4, 4), goal=(0, 11), algorithm="kruskal", seed=6)):
+            self._check_maze(batch_bfs, maze, len(bfs(maze)[0]))
+            self.assertEqual(maze.id_to_state(maze.state_to_id(maze.goal_state)), maze.goal_state)
+
+        matrix = [
+            [1, None, 1, 1],
+            [None, 1, 1, 1],
+            [None, 1, 1, 1],
+            [1, None, 1, 1]
+        ]
+        #plain lists work as the CSR arrays too, not only buffers
+        list_graph = SparseDirectedGraph([0, 3, 6, 9, 12], [0, 2, 3, 1, 2, 3, 1, 2, 3, 0, 2, 3], [1.0] * 12, {1})
+        for graph in (DirectedGraph(matrix, {1}), SparseDirectedGraph.from_matrix(matrix, {1}), list_graph):
+            self._check_maze(batch_bfs, graph, length=3)
+            sources, targets = graph.get_successors_batch(np.array([3, 0]))
+            self.assertEqual(sorted(zip(sources.tolist(), targets.tolist())),
+                             [(0, 0), (0, 2), (0, 3), (3, 0), (3, 2), (3, 3)])
+
+        no_solution_graph = self._no_solution_graph()
+        self.assertEqual(batch_bfs(no_solution_graph)[0], None)
+
+        #problems without state numbers fall back to bfs
+        generator = MazeGenerator(3, 3)
+        batch_bfs(generator)
+        self.assertEqual(generator.visited_cells_count, 9)
+
+
+    def test_search_steps_and_budgets(self):
+        maze = Maze(15, 15, algorithm="kruskal", seed=3)
+        bfs_path = bfs(maze)[0]
+
+        #the generators yield the live stats and return the same result as the plain searches
+        steps = bfs_steps(maze, report_every=5)
+        reports = [stats["states_expanded"] for stats in steps]
+        self.assertTrue(reports and all(expanded % 5 == 0 for expanded in reports))
+        for make_steps, search in ((bfs_steps, bfs), (dfs_steps, dfs), (ucs_steps, ucs),
+                                   (bidirectional_bfs_steps, bidirectional_bfs), (batch_bfs_steps, batch_bfs)):
+            path, stats = run_search(make_steps(maze))
+            self.assertEqual(stats["status"], "solved")
+            self.assertEqual((path, stats["states_expanded"]), (search(maze)[0], search(maze)[1]["states_expanded"]))
+
+        #a search stopped by a budget can be resumed where it left off
+        steps = astar_steps(maze, manhattan_heuristic)
+        path, stats = run_search(steps, max_expansions=10)
+        self.assertEqual((path, stats["status"], stats["states_expanded"]), (None, "max_expansions", 10))
+        path, stats = run_search(steps, max_expansions=20)
+        self.assertEqual((path, stats["states_expanded"]), (None, 20))
+        path, stats = run_search(steps)
+        self.assertEqual((len(path), stats["status"]), (len(bfs_path), "solved"))
+        self.assertEqual(stats["states_expanded"], astar(maze, manhattan_heuristic)[1]["states_expanded"])
+
+        path, stats = run_search(bfs_steps(maze), max_frontier=1)
+        self.assertEqual((path, stats["status"]), (None, "max_frontier"))
+        self.assertGreater(stats["max_frontier_size"], 1)
+        path, stats = run_search(bfs_steps(maze), deadline_seconds=0)
+        self.assertEqual((path, stats["status"], stats["states_expanded"]), (None, "deadline", 1))
+
+        no_solution_graph = self._no_solution_graph()
+        self.assertEqual(run_search(bfs_steps(no_solution_graph))[1]["status"], "no_solution")
+
+        #a search that never yields could never be stopped by run_search
+        for report_every in (None, 0, -1):
+            for make_steps in (bfs_steps, dfs_steps, ucs_steps, astar_steps, bidirectional_bfs_steps, batch_bfs_steps):
+                self.assertRaises(ValueError, make_steps, maze, report_every=report_every)
+
+    def test_search_hooks(self):
+        class Recorder(SearchHooks):
+            def __init__(self):
+                self.expanded, self.goals = [], []
+
+            def on_expand(self, state):
+                self.expanded.append(state)
+
+            def on_goal(self, state):
+                self.goals.append(state)
+
+        maze = Maze(12, 12, algorithm="kruskal", seed=8)
+        for search in (bfs, dfs, ucs, bidirectional_bfs, batch_bfs):
+            recorder, counter = Recorder(), CountingCollector()
+            path, stats = search(maze, hooks=HookList(recorder, counter, TimingCollector(), MemoryCollector()))
+            self.assertEqual(path, search(maze)[0])
+            self.assertEqual(recorder.goals, [maze.goal_state])
+            self.assertEqual(len(recorder.expanded), stats["states_expanded"])
+            self.assertEqual(counter.expanded, stats["states_expanded"])
+            #in a perfect maze the only successor already reached is the room a state was reached from,
+            # so every expanded state but the roots (the start, and the goal for bidirectional_bfs) has one
+            roots = 2 if search is bidirectional_bfs else 1
+            self.assertEqual(counter.duplicates, stats["states_expanded"] - roots)
+            for key in ("seconds", "expansions_per_second", "duplicate_rate", "successor_seconds",
+                        "goal_test_seconds", "frontier_seconds", "peak_memory_bytes"):
+                self.assertIn(key, stats)
+            self.assertGreater(stats["peak_memory_bytes"], 0)
+            self.assertLessEqual(stats["successor_seconds"] + stats["goal_test_seconds"], stats["seconds"])
+
+    def test_benchmark(self):
+        records = run_benchmarks(sizes=(6,), algorithms=("bfs", "astar"), generators=("kruskal",),
+                                 graph_nodes=20, densities=(0.3,), seed=4)
+        self.assertEqual([(record["benchmark"], record["algorithm"]) for record in records],
+                         [("generate", "kruskal"), ("search", "bfs"), ("search", "astar"),
+                          ("search", "bfs"), ("search", "astar")])
+        maze_bfs = records[1]
+        self.assertEqual(maze_bfs["path_length"], len(bfs(Maze(6, 6, algorithm="kruskal", seed=4))[0]))
+        self.assertEqual(records[2]["path_length"], maze_bfs["path_length"])
+        self.assertGreater(maze_bfs["peak_memory_bytes"], 0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("results.json", "results.csv"):
+                path = os.path.join(directory, name)
+                write_results(records, path)
+                self.assertEqual(read_results(path), records)
+
+        self.assertEqual(compare(records, records), [])
+        baseline = [dict(record) for record in records]
+        baseline[1]["seconds"] = records[1]["seconds"] / 2
+        baseline[2]["path_length"] = 1
+        regressions = compare(records, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn("bfs on maze 6x6", regressions[0])
+        self.assertIn("path length", regressions[1])
+
+    def test_batch_solver(self):
+        specs = [MazeSpec(seed, 9, 7, seed=seed, algorithm=GENERATION_ALGORITHMS[seed % 3]) for seed in range(10)]
+        specs.append(MazeSpec("corner", 9, 7, seed=1, start=(3, 3), goal=(0, 8)))
+        with tempfile.TemporaryDirectory() as directory:
+            saved = Maze(8, 5, algorithm="wilson", seed=2)
+            filename = os.path.join(directory, "saved.maze")
+            saved.save(filename)
+            specs.append(MazeSpec("saved", path=filename))
+            expected = {}
+            for spec in specs[:-1]:
+                maze = Maze(spec.width, spec.height, spec.start, spec.goal, algorithm=spec.algorithm, seed=spec.seed)
+                expected[spec.id] = len(bfs(maze)[0])
+            expected["saved"] = len(bfs(saved)[0])
+
+            for max_workers in (1, 2):
+                results = list(solve_batch(specs, max_workers=max_workers, chunksize=3))
+                self.assertEqual({result_id: length for result_id, length, _ in results}, expected)
+                self.assertEqual(len(results), len(specs))
+                for result_id, length, stats in results:
+                    self.assertEqual(stats["path_length"], length)
+            self.assertEqual(next(solve_batch([MazeSpec("dfs", 5, 5, seed=3)], search=dfs, max_workers=2))[0], "dfs")
+        self.assertRaises(ValueError, MazeSpec, "incomplete", width=5)
+
+    def test_maze_path_index(self):
+        maze = Maze(14, 11, algorithm="wilson", seed=5)
+        rng = np.random.default_rng(5)
+        for problem in (maze, ArrayMaze.from_maze(maze)):
+            index = MazePathIndex(problem)
+            starts, goals = [], []
+            for a, b in rng.integers(0, 14 * 11, size=(25, 2)).tolist():
+                start = MazeState(problem, divmod(a, 14))
+                goal = MazeState(problem, divmod(b, 14))
+                query = Maze(14, 11, start.location, goal.location, self_generating=False, board=maze.board)
+                bfs_path = bfs(query)[0]
+                self.assertEqual([state.location for state in index.path(start, goal)],
+                                 [state.location for state in bfs_path])
+                self.assertEqual(index.distance(start, goal), len(bfs_path) - 1)
+                starts.append(index.state_to_id(start))
+                goals.append(index.state_to_id(goal))
+            self.assertEqual(index.distances(starts, goals).tolist(),
+                             [index.distance(index._from_id(a), index._from_id(b)) for a, b in zip(starts, goals)])
+            self.assertEqual(index.lca(maze.goal_state, index.root).location, index.root.location)
+
+        #a maze with a loop has more than one path between some rooms
+        # (removing any inner wall of a perfect maze makes a loop)
+        col = next(col for col in range(13) if maze.board[5][col].east)
+        maze.remove_wall(5, col, "east")
+        self.assertRaises(ValueError, MazePathIndex, maze)
+        self.assertRaises(ValueError, MazePathIndex, ArrayMaze.from_maze(maze))
+
+    def test_landmark_heuristic(self):
+        maze = self._braided_maze(16, 12, seed=9, col=7)
+        graph = random_graph(60, 0.06, seed=2)
+        for problem in (maze, graph):
+            index = LandmarkIndex(problem, k=4)
+            self.assertEqual(len(set(index.landmarks.tolist())), 4)
+            heuristic = index.heuristic()
+            ucs_path, ucs_stats = ucs(problem)
+            alt_path, alt_stats = astar(problem, heuristic)
+            self.assertEqual(alt_stats["path_cost"], ucs_stats["path_cost"])
+            self.assertLessEqual(alt_stats["states_expanded"], ucs_stats["states_expanded"])
+            #the estimate never exceeds the true distance to the goal (admissible)
+            for state_id in range(0, problem.num_states(), 7):
+                state = problem.id_to_state(state_id)
+                goal_distance = index._distances(problem.state_to_id(state), weighted_successors)
+                true_distance = min(goal_distance[problem.state_to_id(goal)] for goal in problem.get_goal_states())
+                self.assertLessEqual(heuristic(state, problem), true_distance)
+
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "landmarks.npz")
+                index.save(filename)
+                loaded = LandmarkIndex.load(filename, problem)
+                self.assertTrue(np.array_equal(loaded.forward, index.forward))
+                self.assertEqual(astar(problem, loaded.heuristic())[0], alt_path)
+                self.assertRaises(ValueError, LandmarkIndex.load, filename, Maze(3, 3))
+
+    def test_multi_query_search(self):
+        graph = random_graph(50, 0.06, seed=3)
+        graph.goal_indices = {7, 30, 49}
+        sources = list(range(0, 50, 3)) + [7, 0]
+        paths, stats = nearest_goal_search(graph, sources)
+        self.assertEqual(stats["queries"], len(set(sources)))
+        self.assertEqual(set(paths), set(sources))
+        for source in set(sources):
+            expected_path, expected_stats = ucs(DirectedGraph(graph.matrix, graph.goal_indices, start_state=source))
+            if expected_path is None:
+                self.assertIsNone(paths[source])
+                continue
+            path = paths[source]
+            self.assertEqual((path[0], path[-1] in graph.goal_indices), (source, True))
+            self.assertEqual(stats["path_costs"][source], expected_stats["path_cost"])
+            self.assertEqual(sum(graph.matrix[a][b] for a, b in zip(path, path[1:])), expected_stats["path_cost"])
+        self.assertEqual(stats["solved"], len(stats["path_costs"]))
+        self.assertEqual(paths[7], [7])
+
+        #one forward sweep from several starts finds the nearest of them for each target
+        maze = Maze(15, 10, algorithm="wilson", seed=4)
+        starts = [maze.get_state(0, 0), maze.get_state(9, 0), maze.get_state(0, 14)]
+        targets = [maze.goal_state, maze.get_state(5, 5)]
+        paths, stats = multi_source_search(maze, starts, targets)
+        for target in targets:
+            nearest = min(len(bfs(Maze(15, 10, start.location, target.location, self_generating=False, board=maze.board))[0])
+                          for start in starts)
+            self.assertEqual(len(paths[target]), nearest)
+            self.assertIn(paths[target][0], starts)
+            self.assertEqual(paths[target][-1], target)
+            self.assertEqual(stats["path_costs"][target], nearest - 1)
+        self.assertEqual(multi_source_search(maze, starts)[0].keys(), {maze.goal_state})
+
+    def test_incremental_replanning(self):
+        maze = Maze(18, 14, algorithm="kruskal", seed=12)
+        rng = np.random.default_rng(12)
+        #knock some walls through, so closing one wall usually leaves another way round
+        for row, col in rng.integers(0, 13, size=(30, 2)).tolist():
+            maze.remove_wall(row, col, "east")
+        planner = IncrementalPlanner(maze)
+        path, stats = planner.replan(compare=True)
+        self.assertEqual(len(path), len(bfs(maze)[0]))
+        self.assertEqual(stats["states_expanded"], stats["initial_states_expanded"])
+
+        #closing every wall around the goal cuts it off, and opening them reconnects it
+        goal_row, goal_col = maze.goal_state.location
+        planner.update_walls([(goal_row, goal_col, "north", True), (goal_row, goal_col, "west", True)])
+        self.assertEqual(planner.replan()[0], None)
+        planner.update_walls([(goal_row, goal_col, "north", False), (goal_row, goal_col, "west", False)])
+        path = planner.replan()[0]
+        self.assertIsNotNone(path)
+        self.assertEqual(len(path), len(bfs(maze)[0]))
+
+        repaired, full = 0, 0
+        for step in range(40):
+            row, col = int(rng.integers(0, 13)), int(rng.integers(0, 17))
+            direction = "east" if step % 2 else "south"
+            planner.update_walls([(row, col, direction, not getattr(maze.board[row][col], direction))])
+            path, stats = planner.replan(compare=True)
+            expected = bfs(maze)[0]
+            if expected is None:
+                self.assertIsNone(path)
+            else:
+                self._check_maze(lambda problem: (path, stats), maze, len(expected))
+            repaired += stats["states_expanded"]
+            full += stats["full_search_states_expanded"]
+        self.assertEqual(stats["replans"], 43)
+        self.assertLess(repaired, full)
+
+        self.assertRaises(ValueError, planner.update_walls, [(0, 0, "north", False)])
+
+    def test_external_bfs(self):
+        maze = Maze(13, 9, algorithm="wilson", seed=7)
+        graph = random_graph(80, 0.03, seed=5)
+        with tempfile.TemporaryDirectory() as directory:
+            for problem in (maze, ArrayMaze.from_maze(maze), graph):
+                #a tiny memory limit spills a run every few states
+                path, stats = external_bfs(problem, memory_limit=2000, temp_dir=directory)
+                self.assertEqual(len(path), len(bfs(problem)[0]))
+                self.assertEqual((path[0], problem.is_goal_state(path[-1])), (problem.get_start_state(), True))
+                for state, next_state in zip(path, path[1:]):
+                    self.assertIn(next_state, problem.get_successors(state))
+                self.assertGreater(stats["runs_written"], stats["layers"])
+                self.assertEqual(os.listdir(directory), [])
+            self._check_maze(lambda problem: external_bfs(problem, temp_dir=directory), maze, len(bfs(maze)[0]))
+
+            #moves in a maze can be undone, so each layer only needs checking against the two before it
+            braided = self._braided_maze(16, 12, seed=9, col=7)
+            path, stats = external_bfs(braided, memory_limit=2000, temp_dir=directory, reversible=True)
+            self.assertEqual(len(path), len(bfs(braided)[0]))
+            self.assertEqual(stats["states_expanded"], external_bfs(braided, temp_dir=directory)[1]["states_expanded"])
+
+            #every generated successor is either a new state or a reported duplicate
+            graph.goal_indices = set()
+            counter = CountingCollector()
+            path, stats = external_bfs(graph, memory_limit=2000, temp_dir=directory, hooks=counter)
+            self.assertIsNone(path)
+            reached = bfs(graph)[1]["states_expanded"]
+            self.assertEqual(stats["states_expanded"], reached)
+            self.assertEqual(counter.generated - counter.duplicates, reached - 1)
+        #wrapped problems serialize through the problem they wrap, so caching and timing work too
+        with tempfile.TemporaryDirectory() as directory:
+            timing = TimingCollector()
+            path, stats = external_bfs(maze, temp_dir=directory, hooks=timing)
+            self.assertEqual(len(path), len(bfs(maze)[0]))
+            self.assertGreater(stats["successor_seconds"], 0)
+            cached = CachedProblem(maze)
+            self.assertEqual(external_bfs(cached, temp_dir=directory)[0], path)
+            self.assertGreater(cached.misses, 0)
+        self.assertRaises(NotImplementedError, external_bfs, MazeGenerator(3, 3))
+
+    def test_async_search(self):
+        maze = self._braided_maze(14, 10, seed=4, col=6)
+        graph = random_graph(120, 0.04, seed=8)
+        for problem in (maze, graph):
+            for concurrency in (1, 8):
+                store = FakeGraphStore(problem, latency=0)
+                path, stats = asyncio.run(async_bfs(store, concurrency))
+                #fetching ahead does not change the order states are discovered in
+                self.assertEqual(path, bfs(problem)[0])
+                self.assertEqual(store.max_in_flight > 1, concurrency > 1)
+                self.assertLessEqual(store.max_in_flight, concurrency)
+                store = FakeGraphStore(problem, latency=0)
+                path, stats = asyncio.run(async_astar(store, concurrency=concurrency))
+                self.assertEqual(stats["path_cost"], ucs(problem)[1]["path_cost"])
+                self.assertEqual((path[0], problem.is_goal_state(path[-1])), (problem.get_start_state(), True))
+                self.assertEqual(sum(dict(weighted_successors(problem, state))[next_state]
+                                     for state, next_state in zip(path, path[1:])), stats["path_cost"])
+        #the maze's heuristic still guides the search through the store
+        store = FakeGraphStore(maze, latency=0)
+        path, stats = asyncio.run(async_astar(store, lambda state, problem: manhattan_heuristic(state, maze), concurrency=4))
+        self.assertEqual(len(path), len(bfs(maze)[0]))
+        graph.goal_indices = set()
+        self.assertEqual(asyncio.run(async_bfs(FakeGraphStore(graph, latency=0)))[0], None)
+        self.assertEqual(asyncio.run(async_astar(FakeGraphStore(graph, latency=0)))[0], None)
+
+    def test_bulk_maze_generation(self):
+        for algorithm in BULK_ALGORITHMS:
+            walls = generate_mazes(range(40), 13, 9, algorithm)
+            self.assertEqual(walls.shape, (40, 9, 13))
+            #each maze depends only on its own seed, not on the batch it was generated in
+            np.testing.assert_array_equal(generate_mazes([25, 3], 13, 9, algorithm), walls[[25, 3]])
+            self.assertFalse((walls[0] == walls[1]).all())
+            for maze_walls in walls:
+                #MazePathIndex only accepts perfect mazes
+                MazePathIndex(ArrayMaze(maze_walls))
+        self.assertRaises(ValueError, generate_mazes, [0], 5, 5, "kruskal")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mazes.npy")
+            self.assertEqual(write_dataset(path, range(100, 130), 11, 7, "sidewinder", chunk_size=8), 30)
+            expected = generate_mazes(range(100, 130), 11, 7, "sidewinder")
+            np.testing.assert_array_equal(np.load(path), expected)
+            mazes = load_mazes(path)
+            self.assertEqual(next(mazes).goal_state.location, (6, 10))
+            for maze, maze_walls in zip(mazes, expected[1:]):
+                np.testing.assert_array_equal(ArrayMaze.from_maze(maze).walls, maze_walls)
+                self.assertEqual(len(bfs(maze)[0]), len(bfs(ArrayMaze(maze_walls))[0]))
+
 
 if __name__ == "__main__":
     unittest.main()